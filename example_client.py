@@ -3,9 +3,15 @@
 Example client script for interacting with the ChatGPT Middleware API.
 """
 
+import asyncio
+import atexit
+import functools
 import requests
 import os
 import json
+import socket
+from http.client import HTTPResponse
+from urllib.parse import urlsplit
 from dotenv import load_dotenv
 
 # Load API key from .env file
@@ -21,12 +27,20 @@ HEADERS = {
     "Content-Type": "application/json"
 }
 
+# Shared session so every helper reuses one keep-alive connection pool
+# instead of paying TCP (and TLS) setup on each call
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+_adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+atexit.register(SESSION.close)
+
 def run_cli_command(command):
     """Execute a CLI command through the middleware."""
-    response = requests.post(
+    response = SESSION.post(
         f"{BASE_URL}/cli",
-        params={"command": command},
-        headers=HEADERS
+        params={"command": command}
     )
     
     if response.status_code == 200:
@@ -34,38 +48,54 @@ def run_cli_command(command):
     else:
         return f"Error: {response.status_code} - {response.text}"
 
-def read_file(file_path):
-    """Read a file through the middleware."""
-    response = requests.get(
+@functools.lru_cache(maxsize=256)
+def _read_file_cached(file_path):
+    """Fetch a file, memoizing only successes.
+
+    Failures raise instead of returning, because lru_cache never stores
+    a call that raised — a transient error or a read issued before the
+    file exists must not be replayed from cache forever.
+    """
+    response = SESSION.get(
         f"{BASE_URL}/read-file",
-        params={"path": file_path},
-        headers=HEADERS
+        params={"path": file_path}
     )
-    
-    if response.status_code == 200:
-        return response.json()["content"]
-    else:
-        return f"Error: {response.status_code} - {response.text}"
+
+    if response.status_code != 200:
+        raise RuntimeError(f"Error: {response.status_code} - {response.text}")
+    return response.json()["content"]
+
+def read_file(file_path):
+    """Read a file through the middleware.
+
+    Successful reads are cached per path, so repeats skip the network
+    round-trip entirely; errors are reported but never cached.
+    write_file invalidates the cache.
+    """
+    try:
+        return _read_file_cached(file_path)
+    except RuntimeError as exc:
+        return str(exc)
 
 def write_file(file_path, content):
     """Write content to a file through the middleware."""
-    response = requests.post(
+    response = SESSION.post(
         f"{BASE_URL}/write-file",
-        json={"path": file_path, "content": content},
-        headers=HEADERS
+        json={"path": file_path, "content": content}
     )
     
     if response.status_code == 200:
+        # Drop cached reads so the next read_file sees the new content
+        _read_file_cached.cache_clear()
         return f"Successfully wrote to {file_path}"
     else:
         return f"Error: {response.status_code} - {response.text}"
 
 def create_item(name, description):
     """Create a new item in the database."""
-    response = requests.post(
+    response = SESSION.post(
         f"{BASE_URL}/items",
-        json={"name": name, "description": description},
-        headers=HEADERS
+        json={"name": name, "description": description}
     )
     
     if response.status_code == 200:
@@ -73,34 +103,182 @@ def create_item(name, description):
     else:
         return f"Error: {response.status_code} - {response.text}"
 
+@functools.lru_cache(maxsize=256)
+def _get_item_cached(item_id):
+    """Fetch an item, memoizing only successes (failures raise)"""
+    response = SESSION.get(
+        f"{BASE_URL}/items/{item_id}"
+    )
+
+    if response.status_code != 200:
+        raise RuntimeError(f"Error: {response.status_code} - {response.text}")
+    return response.json()
+
 def get_item(item_id):
-    """Retrieve an item from the database by ID."""
-    response = requests.get(
-        f"{BASE_URL}/items/{item_id}",
-        headers=HEADERS
+    """Retrieve an item from the database by ID.
+
+    Successful lookups are cached per ID since items are only ever
+    created, never updated, through this client; a 404 or transient
+    failure is never cached, so retrying after the item appears works.
+    """
+    try:
+        return _get_item_cached(item_id)
+    except RuntimeError as exc:
+        return str(exc)
+
+def read_file_stream(file_path, chunk_size=65536):
+    """Stream a file through the middleware, yielding raw byte chunks.
+
+    Peak memory stays at one chunk regardless of file size; use this
+    instead of read_file for large files.
+    """
+    with SESSION.get(
+        f"{BASE_URL}/read-file-raw",
+        params={"path": file_path},
+        stream=True
+    ) as response:
+        response.raise_for_status()
+        yield from response.iter_content(chunk_size)
+
+def write_file_stream(file_path, fileobj):
+    """Write a file through the middleware from a binary file object.
+
+    The body is sent with chunked transfer encoding, so the client never
+    holds more than one chunk in memory.
+    """
+    response = SESSION.post(
+        f"{BASE_URL}/write-file-raw",
+        params={"path": file_path},
+        data=fileobj,
+        headers={"Content-Type": "application/octet-stream"}
     )
-    
+
     if response.status_code == 200:
-        return response.json()
+        _read_file_cached.cache_clear()
+        return f"Successfully wrote to {file_path}"
     else:
         return f"Error: {response.status_code} - {response.text}"
 
-if __name__ == "__main__":
+class _SharedReader:
+    """Socket stand-in handing every HTTPResponse one shared buffered stream.
+
+    HTTPResponse(sock) would call sock.makefile("rb") per response; each
+    of those buffered readers reads ahead past its own response's body
+    and swallows the bytes of the pipelined responses behind it. Routing
+    every response through the same reader keeps the read-ahead in one
+    buffer, and close() is a no-op because the stream outlives each
+    response.
+    """
+    def __init__(self, fp):
+        self._fp = fp
+
+    def makefile(self, *_args, **_kwargs):
+        return self
+
+    def close(self):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self._fp, name)
+
+def pipeline(requests_list):
+    """Send a batch of requests back-to-back over one keep-alive connection.
+
+    Each entry is a (method, path, body) tuple, e.g.
+    ``("POST", "/cli?command=ls", None)`` or
+    ``("POST", "/write-file", {"path": "a.txt", "content": "hi"})``.
+    All requests are serialized into one buffer and written with a single
+    sendall before any response is read, so the batch costs roughly one
+    round-trip plus server time instead of one round-trip per request.
+
+    Returns a list of parsed JSON results (or a status/body dict when the
+    response is not JSON), in the same order as the input.
+    """
+    parts = urlsplit(BASE_URL)
+    host = parts.hostname or "localhost"
+    port = parts.port or 80
+
+    # Build one contiguous buffer of request lines + headers + bodies
+    buffer = bytearray()
+    for method, path, body in requests_list:
+        payload = b"" if body is None else json.dumps(body).encode("utf-8")
+        buffer += f"{method} {path} HTTP/1.1\r\n".encode("ascii")
+        buffer += f"Host: {host}:{port}\r\n".encode("ascii")
+        for name, value in HEADERS.items():
+            if value:
+                buffer += f"{name}: {value}\r\n".encode("ascii")
+        buffer += f"Content-Length: {len(payload)}\r\n\r\n".encode("ascii")
+        buffer += payload
+
+    sock = socket.create_connection((host, port))
+    reader = _SharedReader(sock.makefile("rb"))
+    try:
+        sock.sendall(bytes(buffer))
+
+        # Responses come back in request order on the same connection,
+        # all parsed from the one shared stream
+        results = []
+        for _ in requests_list:
+            response = HTTPResponse(reader)
+            response.begin()
+            data = response.read()
+            try:
+                results.append(json.loads(data))
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                results.append({
+                    "status": response.status,
+                    "body": data.decode("utf-8", errors="replace")
+                })
+        return results
+    finally:
+        reader._fp.close()
+        sock.close()
+
+# Async variants: run the sync helpers on worker threads so independent
+# calls can overlap their round-trips instead of serializing them
+async def run_cli_command_async(command):
+    """Async wrapper around run_cli_command."""
+    return await asyncio.to_thread(run_cli_command, command)
+
+async def read_file_async(file_path):
+    """Async wrapper around read_file."""
+    return await asyncio.to_thread(read_file, file_path)
+
+async def write_file_async(file_path, content):
+    """Async wrapper around write_file."""
+    return await asyncio.to_thread(write_file, file_path, content)
+
+async def create_item_async(name, description):
+    """Async wrapper around create_item."""
+    return await asyncio.to_thread(create_item, name, description)
+
+async def get_item_async(item_id):
+    """Async wrapper around get_item."""
+    return await asyncio.to_thread(get_item, item_id)
+
+async def main():
     # Example usage
     print("1. Running CLI command 'ls -la':")
-    print(run_cli_command("ls -la"))
-    
-    print("\n2. Writing to a test file:")
-    write_file("test_output.txt", "This is a test file created by the middleware client.")
-    
+    print(await run_cli_command_async("ls -la"))
+
+    # Independent steps: issue the file write and the item creation
+    # concurrently so we pay max(RTT) instead of sum(RTT)
+    print("\n2. Writing to a test file and creating a database item:")
+    _, item = await asyncio.gather(
+        write_file_async("test_output.txt", "This is a test file created by the middleware client."),
+        create_item_async("Test Item", "This is a test item created by the middleware client.")
+    )
+
     print("\n3. Reading the test file:")
-    print(read_file("test_output.txt"))
-    
-    print("\n4. Creating an item in the database:")
-    item = create_item("Test Item", "This is a test item created by the middleware client.")
+    print(await read_file_async("test_output.txt"))
+
+    print("\n4. Created item:")
     print(json.dumps(item, indent=2) if isinstance(item, dict) else item)
-    
+
     if isinstance(item, dict) and "id" in item:
         print(f"\n5. Retrieving the item with ID {item['id']}:")
-        retrieved_item = get_item(item["id"])
+        retrieved_item = await get_item_async(item["id"])
         print(json.dumps(retrieved_item, indent=2) if isinstance(retrieved_item, dict) else retrieved_item)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -7,11 +7,29 @@ a Custom GPT with access to your system through CLI, filesystem, and database.
 """
 
 import os
+import copy
 import json
+import time
 import socket
+import functools
 import requests
 from dotenv import load_dotenv
 
+# Use the C-accelerated orjson serializer when available; fall back to
+# the stdlib so the script keeps working without it
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Load environment variables once at import instead of inside each helper
+load_dotenv()
+
+# Shared session so every localhost probe reuses one pooled connection;
+# a small adapter pool covers the health and ngrok probes
+SESSION = requests.Session()
+SESSION.mount("http://", requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=4))
+
 # ANSI colors for terminal output
 class Colors:
     BLUE = '\033[94m'
@@ -21,209 +39,244 @@ class Colors:
     BOLD = '\033[1m'
     END = '\033[0m'
 
-def main():
-    print(f"\n{Colors.BOLD}🔧 ChatGPT System Access - Schema Generator{Colors.END}")
-    print("================================================")
+@functools.lru_cache(maxsize=1)
+def get_api_key():
+    """Get the middleware API key from the environment"""
+    return os.getenv("API_KEY", "default_middleware_key")
 
-    # Load API key
-    load_dotenv()
-    api_key = os.getenv("API_KEY", "default_middleware_key")
-    
-    # Check if server is running
-    server_running = False
+@functools.lru_cache(maxsize=1)
+def _probe_localhost():
+    """Probe the local middleware once per process.
+
+    Returns (is_up, status_code) so every caller that needs to know
+    whether the server is reachable shares this single GET instead of
+    issuing its own probe with its own timeout.
+    """
     try:
-        requests.get("http://localhost:8000/health", timeout=1)
-        server_running = True
+        response = SESSION.get("http://localhost:8000/health", timeout=1)
+        return True, response.status_code
     except:
-        print(f"{Colors.RED}❌ Server not running! Start it with: ./setup.sh{Colors.END}")
-        return
+        return False, None
 
-    # Detect publicly accessible URL (ngrok)
-    public_url = None
+def is_server_running():
+    """Check whether the local middleware server is reachable"""
+    return _probe_localhost()[0]
+
+@functools.lru_cache(maxsize=1)
+def get_ngrok_url():
+    """Detect a publicly accessible ngrok HTTPS tunnel (cached per process)"""
     try:
-        response = requests.get("http://localhost:4040/api/tunnels", timeout=1)
+        response = SESSION.get("http://localhost:4040/api/tunnels", timeout=1)
         data = response.json()
         for tunnel in data.get('tunnels', []):
             if tunnel.get('proto') == 'https':
-                public_url = tunnel.get('public_url')
-                break
+                return tunnel.get('public_url')
     except:
         pass
+    return None
 
-    # Get local network IP
+@functools.lru_cache(maxsize=1)
+def get_local_network_url():
+    """Resolve the local network URL (cached to avoid repeat DNS syscalls)"""
     try:
         hostname = socket.gethostname()
         local_ip = socket.gethostbyname(hostname)
-        local_network = f"http://{local_ip}:8000"
+        return f"http://{local_ip}:8000"
     except:
-        local_network = "http://localhost:8000"
-
-    # Generate schema
-    schema = {
-        "openapi": "3.1.0",
-        "info": {
-            "title": "System Access API",
-            "description": "API for system access via CLI, Filesystem, and Database",
-            "version": "v1"
-        },
-        "servers": [
-            {
-                "url": public_url if public_url else local_network,
-                "description": "Server endpoint"
-            }
-        ],
-        "paths": {
-            "/cli": {
-                "post": {
-                    "summary": "Execute a CLI command",
-                    "operationId": "executeCommand",
-                    "parameters": [
-                        {
-                            "name": "command",
-                            "in": "query",
-                            "required": True,
-                            "schema": {
-                                "type": "string"
-                            },
-                            "description": "Command to execute"
-                        }
-                    ],
-                    "responses": {
-                        "200": {
-                            "description": "Command executed successfully"
-                        }
-                    }
-                }
-            },
-            "/read-file": {
-                "get": {
-                    "summary": "Read a file",
-                    "operationId": "readFile",
-                    "parameters": [
-                        {
-                            "name": "path",
-                            "in": "query",
-                            "required": True,
-                            "schema": {
-                                "type": "string"
-                            },
-                            "description": "Path to the file"
-                        }
-                    ],
-                    "responses": {
-                        "200": {
-                            "description": "File content"
-                        }
-                    }
-                }
-            },
-            "/write-file": {
-                "post": {
-                    "summary": "Write to a file",
-                    "operationId": "writeFile",
-                    "requestBody": {
-                        "required": True,
-                        "content": {
-                            "application/json": {
-                                "schema": {
-                                    "type": "object",
-                                    "properties": {
-                                        "path": {
-                                            "type": "string",
-                                            "description": "Path to the file"
-                                        },
-                                        "content": {
-                                            "type": "string",
-                                            "description": "Content to write"
-                                        }
-                                    },
-                                    "required": ["path", "content"]
-                                }
-                            }
-                        }
-                    },
-                    "responses": {
-                        "200": {
-                            "description": "File written successfully"
-                        }
-                    }
-                }
-            },
-            "/items": {
-                "post": {
-                    "summary": "Create a database item",
-                    "operationId": "createItem",
-                    "requestBody": {
-                        "required": True,
-                        "content": {
-                            "application/json": {
-                                "schema": {
-                                    "type": "object",
-                                    "properties": {
-                                        "name": {
-                                            "type": "string",
-                                            "description": "Item name"
-                                        },
-                                        "description": {
-                                            "type": "string",
-                                            "description": "Item description"
-                                        }
-                                    },
-                                    "required": ["name", "description"]
-                                }
-                            }
-                        }
-                    },
-                    "responses": {
-                        "200": {
-                            "description": "Item created successfully"
-                        }
-                    }
-                }
-            },
-            "/items/{item_id}": {
-                "get": {
-                    "summary": "Get a database item",
-                    "operationId": "getItem",
-                    "parameters": [
-                        {
-                            "name": "item_id",
-                            "in": "path",
-                            "required": True,
-                            "schema": {
-                                "type": "integer"
-                            },
-                            "description": "Item ID"
-                        }
-                    ],
-                    "responses": {
-                        "200": {
-                            "description": "Item details"
-                        }
-                    }
-                }
-            }
+        return "http://localhost:8000"
+
+# Helpers for building OpenAPI Path Item Objects from a compact table;
+# the five operations share identical parameter/response shapes, so
+# hand-writing each one invites copy-paste drift
+
+def _param(name, typ, description, loc="query"):
+    """Build a required parameter spec"""
+    return {
+        "name": name,
+        "in": loc,
+        "required": True,
+        "schema": {
+            "type": typ
         },
-        "components": {
-            "schemas": {},  # Required for browser compatibility
-            "securitySchemes": {
-                "ApiKeyAuth": {
-                    "type": "apiKey",
-                    "in": "header",
-                    "name": "X-API-Key"
+        "description": description
+    }
+
+def _json_body(properties, required):
+    """Build a required application/json request body spec"""
+    return {
+        "required": True,
+        "content": {
+            "application/json": {
+                "schema": {
+                    "type": "object",
+                    "properties": properties,
+                    "required": required
                 }
             }
-        },
-        "security": [
-            {
-                "ApiKeyAuth": []
-            }
-        ]
+        }
     }
-    
-    # Save schema file
-    with open("openapi.json", "w") as f:
-        json.dump(schema, f, indent=2)
+
+def _build_operation(summary, operation_id, ok_description, parameters=None, request_body=None):
+    """Build an OpenAPI operation object"""
+    operation = {
+        "summary": summary,
+        "operationId": operation_id
+    }
+    if parameters:
+        operation["parameters"] = parameters
+    if request_body:
+        operation["requestBody"] = request_body
+    operation["responses"] = {
+        "200": {
+            "description": ok_description
+        }
+    }
+    return operation
+
+# Compact spec table: (path, method, summary, operationId, 200-description,
+# parameters, request body)
+_PATH_SPECS = [
+    ("/cli", "post", "Execute a CLI command", "executeCommand",
+     "Command executed successfully",
+     [_param("command", "string", "Command to execute")], None),
+    ("/read-file", "get", "Read a file", "readFile",
+     "File content",
+     [_param("path", "string", "Path to the file")], None),
+    ("/write-file", "post", "Write to a file", "writeFile",
+     "File written successfully",
+     None, _json_body({
+         "path": {"type": "string", "description": "Path to the file"},
+         "content": {"type": "string", "description": "Content to write"}
+     }, ["path", "content"])),
+    ("/items", "post", "Create a database item", "createItem",
+     "Item created successfully",
+     None, _json_body({
+         "name": {"type": "string", "description": "Item name"},
+         "description": {"type": "string", "description": "Item description"}
+     }, ["name", "description"])),
+    ("/items/{item_id}", "get", "Get a database item", "getItem",
+     "Item details",
+     [_param("item_id", "integer", "Item ID", loc="path")], None),
+]
+
+# OpenAPI schema template, built once at import; the server URL is the
+# only dynamic field and is patched in per call
+_OPENAPI_TEMPLATE = {
+    "openapi": "3.1.0",
+    "info": {
+        "title": "System Access API",
+        "description": "API for system access via CLI, Filesystem, and Database",
+        "version": "v1"
+    },
+    "servers": [
+        {
+            "url": None,  # patched in generate_openapi_schema
+            "description": "Server endpoint"
+        }
+    ],
+    "paths": {
+        path: {method: _build_operation(summary, op_id, ok_desc, params, body)}
+        for path, method, summary, op_id, ok_desc, params, body in _PATH_SPECS
+    },
+    "components": {
+        "schemas": {},  # Required for browser compatibility
+        "securitySchemes": {
+            "ApiKeyAuth": {
+                "type": "apiKey",
+                "in": "header",
+                "name": "X-API-Key"
+            }
+        }
+    },
+    "security": [
+        {
+            "ApiKeyAuth": []
+        }
+    ]
+}
+
+# Discovered endpoints are cached on disk so warm runs (watchers,
+# repeated regenerations) skip the ngrok HTTP probe and DNS lookup
+CACHE_FILE = ".gpt_config_cache.json"
+
+def discover_endpoints(ttl=30):
+    """Return (public_url, local_network), cached on disk with a TTL.
+
+    Re-probes ngrok and the local IP only when the cache file is older
+    than ttl seconds or unreadable; the health check in main() remains
+    the liveness gate.
+    """
+    try:
+        if time.time() - os.stat(CACHE_FILE).st_mtime < ttl:
+            with open(CACHE_FILE, "r") as f:
+                cached = json.load(f)
+            return cached.get("public_url"), cached.get("local_network")
+    except (OSError, ValueError):
+        pass
+
+    public_url = get_ngrok_url()
+    local_network = get_local_network_url()
+
+    try:
+        with open(CACHE_FILE, "w") as f:
+            json.dump({"public_url": public_url, "local_network": local_network}, f)
+    except OSError:
+        pass
+
+    return public_url, local_network
+
+def generate_openapi_schema(base_url):
+    """Return a copy of the schema template pointed at base_url"""
+    schema = copy.deepcopy(_OPENAPI_TEMPLATE)
+    schema["servers"][0]["url"] = base_url
+    return schema
+
+def dump_schema_file(schema, path):
+    """Write an indented JSON schema file, using orjson when available"""
+    if orjson is not None:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(schema, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, "w") as f:
+            json.dump(schema, f, indent=2)
+
+# Sentinel substituted into the pre-serialized template; everything but
+# the server URL is static across runs
+_SERVER_URL_SENTINEL = "__SERVER_URL__"
+
+@functools.lru_cache(maxsize=1)
+def _schema_template_bytes():
+    """Serialize the schema template once, with a sentinel server URL"""
+    schema = generate_openapi_schema(_SERVER_URL_SENTINEL)
+    if orjson is not None:
+        return orjson.dumps(schema, option=orjson.OPT_INDENT_2)
+    return json.dumps(schema, indent=2).encode("utf-8")
+
+def write_schema_file(base_url, path="openapi.json"):
+    """Write the schema for base_url with one bytes.replace, no re-encode"""
+    with open(path, "wb") as f:
+        f.write(_schema_template_bytes().replace(
+            _SERVER_URL_SENTINEL.encode("ascii"), base_url.encode("utf-8")))
+
+def main():
+    print(f"\n{Colors.BOLD}🔧 ChatGPT System Access - Schema Generator{Colors.END}")
+    print("================================================")
+
+    # Load API key
+    api_key = get_api_key()
+
+    # Check if server is running
+    if not is_server_running():
+        print(f"{Colors.RED}❌ Server not running! Start it with: ./setup.sh{Colors.END}")
+        return
+
+    # Detect publicly accessible URL (ngrok) and local network IP,
+    # using the on-disk discovery cache when it is still fresh
+    public_url, local_network = discover_endpoints()
+
+    # Generate and save the schema; only the server URL changes between
+    # runs, so this patches the cached pre-serialized template
+    write_schema_file(public_url if public_url else local_network)
     
     # Print setup instructions
     print(f"\n{Colors.GREEN}✅ OpenAPI schema generated!{Colors.END}")
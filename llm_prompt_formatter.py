@@ -9,6 +9,34 @@ encourage LLMs to accurately represent directory structures and file locations.
 import json
 from typing import Dict, Any, List
 
+# Module-level constants shared across responses; nothing downstream
+# mutates them, so they are built once instead of per call
+_META = {
+    "wrapper_version": "1.0.0",
+    "anti_hallucination": True,
+    "response_format": "structured"
+}
+
+_DEFAULT_SUGGESTED_RESPONSE = "Please provide a response using the structured data format shown above to prevent hallucinations."
+
+_LLM_CLI_INSTRUCTIONS = """
+IMPORTANT INSTRUCTION FOR LLM PROCESSING:
+1. Use ONLY the information provided in this API response
+2. DO NOT extrapolate or assume existence of files/directories not explicitly listed
+3. Present information using the exact paths shown in the response
+4. If possible, use the 'suggested_response' field as a template
+5. Clearly state the exact directory path being listed to prevent confusion
+"""
+
+_LLM_FILE_INSTRUCTIONS = """
+IMPORTANT INSTRUCTION FOR LLM PROCESSING:
+1. Use ONLY the content provided in this API response
+2. DO NOT extrapolate or assume existence of other files or additional content
+3. Present the file content using the exact path shown in the response
+4. If possible, use the 'suggested_response' field as a template
+5. Always specify the exact file path to prevent confusion
+"""
+
 class LLMPromptFormatter:
     """
     Formats API responses to guide LLM interpretation
@@ -27,19 +55,12 @@ class LLMPromptFormatter:
             Enhanced response with LLM guidance
         """
         # Add metadata about structured response
-        response["_meta"] = {
-            "wrapper_version": "1.0.0",
-            "anti_hallucination": True,
-            "response_format": "structured"
-        }
+        response["_meta"] = _META
         
-        # Add explicit LLM instructions based on operation type
-        if operation_type == "cli":
-            response = LLMPromptFormatter._enhance_cli_response(response)
-        elif operation_type == "file_read":
-            response = LLMPromptFormatter._enhance_file_read_response(response)
-            
-        return response
+        # Add explicit LLM instructions based on operation type;
+        # dict dispatch short-circuits unknown types in one lookup
+        enhancer = _DISPATCH.get(operation_type)
+        return enhancer(response) if enhancer else response
     
     @staticmethod
     def _enhance_cli_response(response: Dict[str, Any]) -> Dict[str, Any]:
@@ -47,17 +68,10 @@ class LLMPromptFormatter:
         Add LLM-specific instructions for CLI responses
         """
         if "suggested_response" not in response:
-            response["suggested_response"] = "Please provide a response using the structured data format shown above to prevent hallucinations."
-            
+            response["suggested_response"] = _DEFAULT_SUGGESTED_RESPONSE
+
         # Add LLM instruction preamble
-        response["_llm_instructions"] = """
-IMPORTANT INSTRUCTION FOR LLM PROCESSING:
-1. Use ONLY the information provided in this API response
-2. DO NOT extrapolate or assume existence of files/directories not explicitly listed
-3. Present information using the exact paths shown in the response
-4. If possible, use the 'suggested_response' field as a template
-5. Clearly state the exact directory path being listed to prevent confusion
-"""
+        response["_llm_instructions"] = _LLM_CLI_INSTRUCTIONS
         return response
     
     @staticmethod
@@ -66,18 +80,18 @@ IMPORTANT INSTRUCTION FOR LLM PROCESSING:
         Add LLM-specific instructions for file read responses
         """
         if "suggested_response" not in response:
-            response["suggested_response"] = "Please provide a response using the structured data format shown above to prevent hallucinations."
-            
+            response["suggested_response"] = _DEFAULT_SUGGESTED_RESPONSE
+
         # Add LLM instruction preamble
-        response["_llm_instructions"] = """
-IMPORTANT INSTRUCTION FOR LLM PROCESSING:
-1. Use ONLY the content provided in this API response
-2. DO NOT extrapolate or assume existence of other files or additional content
-3. Present the file content using the exact path shown in the response
-4. If possible, use the 'suggested_response' field as a template
-5. Always specify the exact file path to prevent confusion
-"""
+        response["_llm_instructions"] = _LLM_FILE_INSTRUCTIONS
         return response
 
+# Operation-type dispatch table (defined after the class so the
+# staticmethods exist); .get avoids re-walking an if/elif chain
+_DISPATCH = {
+    "cli": LLMPromptFormatter._enhance_cli_response,
+    "file_read": LLMPromptFormatter._enhance_file_read_response
+}
+
 # Example usage:
 # enhanced_response = LLMPromptFormatter.enhance_api_response(response, "cli")
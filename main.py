@@ -1,23 +1,34 @@
 import os
 import sys
+import hmac
+import hashlib
 import json
+import time
+import logging
+import orjson
+import functools
+import shlex
 import socket
+import asyncio
 import datetime
 import requests
-import shutil
+import jinja2
 from enum import Enum
+from urllib.parse import parse_qs
 from typing import Dict, Any, List, Optional
-from fastapi import FastAPI, HTTPException, Request, Depends, Header, Body, Query
+from fastapi import FastAPI, HTTPException, Request, Depends, Body, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from fastapi.security import APIKeyHeader
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse, RedirectResponse
-from subprocess import Popen, PIPE
+from fastapi.responses import HTMLResponse, RedirectResponse, FileResponse, StreamingResponse
+import aiofiles
+from markdown import markdown
 from dotenv import load_dotenv
-from pydantic import BaseModel, Field
-from sqlalchemy import create_engine, Column, Integer, String
-from sqlalchemy.orm import sessionmaker, declarative_base
+from pydantic import BaseModel, ConfigDict, Field
+from sqlalchemy import event, insert, Column, Integer, String
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import declarative_base
 
 # Import custom modules
 from middleware_output_wrapper import OutputWrapper
@@ -26,6 +37,8 @@ from llm_prompt_formatter import LLMPromptFormatter
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 class SecurityLevel(str, Enum):
     HIGH = "high"
     MEDIUM = "medium"
@@ -37,11 +50,15 @@ class Config:
     API_KEY = os.getenv("API_KEY", "default_middleware_key")
     SECURITY_LEVEL = os.getenv("SECURITY_LEVEL", SecurityLevel.MEDIUM)
     
-    # Command whitelist for high security
-    ALLOWED_COMMANDS = [
-        "ls", "dir", "pwd", "echo", "cat", "head", "tail", 
+    # Command whitelist for high security; frozensets give O(1)
+    # membership checks without per-call allocation
+    ALLOWED_COMMANDS = frozenset({
+        "ls", "dir", "pwd", "echo", "cat", "head", "tail",
         "grep", "find", "wc", "date", "ps", "df"
-    ]
+    })
+
+    # Commands blocked in medium security
+    DANGEROUS_COMMANDS = frozenset({"rm", "rmdir", "mv", "dd", "mkfs", ">", "sudo", "su"})
     
     # Path restrictions for security levels
     # These can be overridden by ALLOWED_PATHS in the .env file
@@ -56,6 +73,10 @@ class Config:
         ALLOWED_PATHS = [path.strip() for path in ALLOWED_PATHS.split(",")]
     else:
         ALLOWED_PATHS = DEFAULT_ALLOWED_PATHS
+
+    # Normalized once at class load so the per-request check skips
+    # repeated realpath work on the allowed roots
+    ALLOWED_PATHS_TUPLE = tuple(os.path.realpath(path) for path in ALLOWED_PATHS)
     
     @classmethod
     def is_command_allowed(cls, command):
@@ -63,13 +84,16 @@ class Config:
         if cls.SECURITY_LEVEL == SecurityLevel.LOW:
             return True
             
-        command_parts = command.strip().split()
+        # Bounded split: only the first token matters here, so there is
+        # no need to allocate the full token list for a long command
+        command_parts = command.split(None, 1)
+        if not command_parts:
+            return False
         base_command = command_parts[0]
-        
+
         if cls.SECURITY_LEVEL == SecurityLevel.MEDIUM:
             # Block dangerous commands in medium security
-            dangerous_commands = ["rm", "rmdir", "mv", "dd", "mkfs", ">", "sudo", "su"]
-            return base_command not in dangerous_commands
+            return base_command not in cls.DANGEROUS_COMMANDS
             
         # High security - only allow whitelisted commands
         return base_command in cls.ALLOWED_COMMANDS
@@ -79,41 +103,180 @@ class Config:
         """Check if a file path is allowed based on security level"""
         if cls.SECURITY_LEVEL == SecurityLevel.LOW:
             return True
-            
-        # For medium and high security, check path restrictions
-        for allowed_path in cls.ALLOWED_PATHS:
-            if path.startswith(allowed_path):
+
+        # realpath resolves symlinks and ".." segments, so it has to run
+        # on every call; only the allow-list traversal for the resolved
+        # path is memoized below
+        return _is_real_path_allowed(os.path.realpath(path))
+
+# Memoized allow-list check, keyed by the already-resolved path so
+# repeat reads of the same file skip re-walking the allowed roots.
+# Bounded so an attacker probing many paths cannot grow it unboundedly.
+@functools.lru_cache(maxsize=1024)
+def _is_real_path_allowed(real_path):
+    # commonpath compares whole path components, so /home/user does
+    # not accidentally allow /home/user2 the way a raw prefix check
+    # would
+    for allowed in Config.ALLOWED_PATHS_TUPLE:
+        try:
+            if os.path.commonpath([real_path, allowed]) == allowed:
                 return True
-                
-        return False
+        except ValueError:
+            # Mixed drives (Windows) or otherwise incomparable paths
+            continue
+    return False
+
+# Files larger than this are streamed back in chunks rather than
+# embedded in a JSON envelope
+STREAM_THRESHOLD = 64 * 1024
+
+# Maximum wall time for a /cli command before it is killed
+CLI_TIMEOUT = 30
+
+# Encoded once at import; saves a Config attribute lookup and an encode
+# on every request by the key-gate middleware
+_API_KEY_BYTES = Config.API_KEY.encode("utf-8")
+
+# Endpoints reachable without a key: docs, health, schemas, and the
+# setup/test pages that a browser hits before the user has the key
+_PUBLIC_PATHS = frozenset({
+    "/", "/health", "/test", "/docs", "/redoc", "/docs/oauth2-redirect",
+    "/openapi.json", "/schema.json", "/simple-schema.json",
+    "/schema-for-gpt", "/setup-gpt", "/chatgpt-guide",
+})
+
+_FORBIDDEN_BODY = b'{"detail":"Invalid API Key"}'
+
+class ApiKeyASGIMiddleware:
+    """Pure ASGI API-key gate.
+
+    Reads scope["headers"] directly and rejects unauthorized requests
+    before FastAPI builds a Request or walks dependency resolution, so
+    the per-request auth cost is a header scan and one compare_digest.
+    """
+
+    def __init__(self, app, key):
+        self.app = app
+        self.key = key
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in _PUBLIC_PATHS:
+            return await self.app(scope, receive, send)
+
+        api_key = None
+        for name, value in scope["headers"]:
+            if name == b"x-api-key":
+                api_key = value
+                break
 
-# API key authentication
-api_key_header = APIKeyHeader(name="X-API-Key")
+        if api_key is None and b"apiKey=" in scope.get("query_string", b""):
+            # Query-parameter fallback used by the /test form; only
+            # parsed when the header is absent
+            values = parse_qs(scope["query_string"].decode("latin-1")).get("apiKey")
+            if values:
+                api_key = values[0].encode("utf-8")
 
-def verify_api_key(api_key: str = Depends(api_key_header)):
-    if api_key != Config.API_KEY:
-        raise HTTPException(status_code=403, detail="Invalid API Key")
+        if api_key is None or not hmac.compare_digest(api_key, self.key):
+            await send({
+                "type": "http.response.start",
+                "status": 403,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(_FORBIDDEN_BODY)).encode("ascii")),
+                ],
+            })
+            await send({"type": "http.response.body", "body": _FORBIDDEN_BODY})
+            return
+
+        await self.app(scope, receive, send)
+
+# Server-URL detection shared by the schema and setup endpoints. The
+# ngrok probe runs in a worker thread (never on the event loop) and the
+# result is cached for a short TTL; repeated schema fetches from ChatGPT
+# skip the round-trip entirely.
+_TUNNEL_CACHE = {"url": None, "expires": 0.0}
+_TUNNEL_CACHE_TTL = 30.0
+_TUNNEL_LOCK = asyncio.Lock()
+
+def _probe_ngrok():
+    """Blocking ngrok tunnel probe; only ever called from a thread"""
+    try:
+        # The ngrok agent API is on loopback and answers in milliseconds;
+        # a short timeout bounds how long a waiter sits on a cold cache
+        # when ngrok is not running
+        response = requests.get("http://localhost:4040/api/tunnels", timeout=0.2)
+        data = response.json()
+        for tunnel in data.get('tunnels', []):
+            if tunnel.get('proto') == 'https':
+                # Ensure URL is properly formatted with no trailing whitespace
+                return tunnel.get('public_url').strip()
+    except:
+        pass
+    return None
+
+async def _get_public_url():
+    """Return the ngrok public URL (or None), refreshed at most per TTL.
+
+    The lock makes the refresh single-flight: when ChatGPT fetches
+    several schema URLs at once, one probe runs and the rest await its
+    result instead of each paying the probe timeout.
+    """
+    if time.monotonic() < _TUNNEL_CACHE["expires"]:
+        return _TUNNEL_CACHE["url"]
+    async with _TUNNEL_LOCK:
+        # A queued waiter may find the cache already refreshed
+        if time.monotonic() >= _TUNNEL_CACHE["expires"]:
+            _TUNNEL_CACHE["url"] = await asyncio.to_thread(_probe_ngrok)
+            _TUNNEL_CACHE["expires"] = time.monotonic() + _TUNNEL_CACHE_TTL
+    return _TUNNEL_CACHE["url"]
+
+@functools.lru_cache(maxsize=1)
+def _get_network_url():
+    """Resolve the local network URL once per process"""
+    try:
+        local_ip = socket.gethostbyname(socket.gethostname())
+        return f"http://{local_ip}:8000"
+    except:
+        return "http://localhost:8000"
+
+async def _get_server_url():
+    """Best server URL for schemas: ngrok tunnel, else local network"""
+    public_url = await _get_public_url()
+    return public_url if public_url else _get_network_url()
 
 app = FastAPI(
     title="ChatGPT System Access Toolkit",
     description="API for system access via CLI, filesystem, and database operations",
-    version="1.0.0"
+    version="1.0.0",
+    # orjson's C encoder serializes dict responses several times faster
+    # than the stdlib encoder used by plain JSONResponse
+    default_response_class=ORJSONResponse
 )
 
 # Custom exception handler for method not allowed
 @app.exception_handler(405)
 async def method_not_allowed_handler(request, exc):
     """Custom handler for method not allowed errors to help debugging"""
-    print(f"METHOD NOT ALLOWED: {request.method} {request.url}")
-    print(f"Allowed methods: {exc.headers.get('allow', 'NONE')}")
+    # Scanners can flood this path; keep it to a gated log line and a
+    # minimal payload, with the methods in the standard Allow header
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("METHOD NOT ALLOWED: %s %s (allow: %s)",
+                     request.method, request.url, exc.headers.get("allow", "NONE"))
     return JSONResponse(
         status_code=405,
-        content={
-            "detail": f"Method {request.method} not allowed for {request.url.path}. Allowed methods: {exc.headers.get('allow', 'NONE')}",
-            "allowed_methods": exc.headers.get("allow", "").split(", ")
-        }
+        content={"detail": f"Method {request.method} not allowed for {request.url.path}"},
+        headers={"allow": exc.headers.get("allow", "")}
     )
 
+# Compress the multi-KB schema and guide responses for clients that
+# accept gzip; registered first so it sits inside the key gate and only
+# successful responses pay the compression cost
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+# Add the key gate first so CORS (added after, hence outermost) still
+# answers preflight requests that carry no key
+app.add_middleware(ApiKeyASGIMiddleware, key=_API_KEY_BYTES)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -123,9 +286,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Add global authentication
-app.dependency_overrides[api_key_header] = lambda: Config.API_KEY
-
 # Add basic routes for health checks and info
 @app.get("/")
 async def root():
@@ -155,136 +315,114 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "ok", "timestamp": datetime.datetime.now().isoformat()}
 
+@functools.lru_cache(maxsize=1)
+def _guide_html_template():
+    """Read and render the import guide once per process.
+
+    The markdown parse and the styled wrapper are identical on every
+    request; only the ngrok URL varies, so the YOUR-NGROK-URL
+    placeholder is kept through rendering and substituted per request.
+    """
+    guide_path = os.path.join(os.path.dirname(__file__), "chatgpt_import_guide.md")
+    with open(guide_path, "r") as f:
+        content = f.read()
+
+    # Convert markdown to HTML
+    html_content = markdown(content)
+
+    # Add some basic styling
+    return f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>ChatGPT Custom GPT Import Guide</title>
+        <style>
+            body {{
+                font-family: system-ui, -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
+                line-height: 1.6;
+                color: #333;
+                max-width: 800px;
+                margin: 0 auto;
+                padding: 20px;
+            }}
+            pre {{
+                background-color: #f5f5f5;
+                padding: 15px;
+                border-radius: 5px;
+                overflow-x: auto;
+            }}
+            code {{
+                background-color: #f5f5f5;
+                padding: 2px 6px;
+                border-radius: 3px;
+            }}
+            h1, h2, h3 {{
+                color: #0066cc;
+            }}
+            .warning {{
+                background-color: #fffaed;
+                border-left: 4px solid #e8b339;
+                padding: 15px;
+                margin: 15px 0;
+                border-radius: 4px;
+            }}
+        </style>
+    </head>
+    <body>
+        {html_content}
+    </body>
+    </html>
+    """
+
+_GUIDE_URL_PLACEHOLDER = b"YOUR-NGROK-URL"
+
+@functools.lru_cache(maxsize=1)
+def _guide_html_parts():
+    """Encode the rendered guide once and split it at the placeholder.
+
+    Responses are then one bytes.join away, with no per-request UTF-8
+    re-encode of the multi-KB page.
+    """
+    return tuple(_guide_html_template().encode("utf-8").split(_GUIDE_URL_PLACEHOLDER))
+
 @app.get("/chatgpt-guide", include_in_schema=False)
 async def get_chatgpt_guide():
     """Serve the ChatGPT import guide"""
     try:
-        guide_path = os.path.join(os.path.dirname(__file__), "chatgpt_import_guide.md")
-        with open(guide_path, "r") as f:
-            content = f.read()
-            
+        # Cold hit reads and renders the markdown file; keep that off
+        # the event loop (cached calls return immediately)
+        parts = await asyncio.to_thread(_guide_html_parts)
+
         # Replace placeholders with actual values
-        public_url = None
-        try:
-            response = requests.get("http://localhost:4040/api/tunnels", timeout=1)
-            data = response.json()
-            for tunnel in data.get('tunnels', []):
-                if tunnel.get('proto') == 'https':
-                    public_url = tunnel.get('public_url')
-                    break
-        except:
-            pass
-            
+        public_url = await _get_public_url()
+
         if public_url:
-            content = content.replace("YOUR-NGROK-URL", public_url.replace("https://", ""))
-            
-        # Convert markdown to HTML
-        from markdown import markdown
-        html_content = markdown(content)
-        
-        # Add some basic styling
-        styled_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>ChatGPT Custom GPT Import Guide</title>
-            <style>
-                body {{
-                    font-family: system-ui, -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
-                    line-height: 1.6;
-                    color: #333;
-                    max-width: 800px;
-                    margin: 0 auto;
-                    padding: 20px;
-                }}
-                pre {{
-                    background-color: #f5f5f5;
-                    padding: 15px;
-                    border-radius: 5px;
-                    overflow-x: auto;
-                }}
-                code {{
-                    background-color: #f5f5f5;
-                    padding: 2px 6px;
-                    border-radius: 3px;
-                }}
-                h1, h2, h3 {{
-                    color: #0066cc;
-                }}
-                .warning {{
-                    background-color: #fffaed;
-                    border-left: 4px solid #e8b339;
-                    padding: 15px;
-                    margin: 15px 0;
-                    border-radius: 4px;
-                }}
-            </style>
-        </head>
-        <body>
-            {html_content}
-        </body>
-        </html>
-        """
-        
-        return HTMLResponse(content=styled_content)
+            url_bytes = public_url.replace("https://", "").encode("utf-8")
+        else:
+            url_bytes = _GUIDE_URL_PLACEHOLDER
+
+        return Response(content=url_bytes.join(parts), media_type="text/html")
     except Exception as e:
         print(f"Error serving guide: {str(e)}")
         raise HTTPException(status_code=500, detail="Error serving guide")
 
-@app.get("/openapi.json", include_in_schema=False, response_class=JSONResponse)
-async def get_openapi_schema():
-    """Serve the OpenAPI schema with correct content-type headers"""
-    # Try to detect if ngrok is running for public URL
-    public_url = None
-    try:
-        response = requests.get("http://localhost:4040/api/tunnels", timeout=1)
-        data = response.json()
-        for tunnel in data.get('tunnels', []):
-            if tunnel.get('proto') == 'https':
-                public_url = tunnel.get('public_url')
-                # Ensure URL is properly formatted with no trailing whitespace
-                public_url = public_url.strip()
-                break
-    except:
-        pass
-        
-    # Get local network URL
-    local_url = "http://localhost:8000"
-    network_url = local_url
-    
-    try:
-        hostname = socket.gethostname()
-        local_ip = socket.gethostbyname(hostname)
-        network_url = f"http://{local_ip}:8000"
-    except:
-        pass
-    
-    # Generate a fresh schema with the current server URL
-    server_url = public_url if public_url else network_url
-    
-    # Ensure server_url has proper format for RFC3986
-    if server_url and not server_url.startswith(("http://", "https://")):
-        server_url = f"https://{server_url}"
-    
-    # Read the base schema structure
-    schema_path = os.path.join(os.path.dirname(__file__), "openapi.json")
-    
-    try:
-        # Read the existing schema but update the server URL
-        with open(schema_path, "r") as f:
+# In-memory cache of the on-disk OpenAPI schema. The document only
+# changes when the detected server URL does, so each request patches the
+# cached dict instead of a read-modify-write round-trip on disk; the
+# files are rewritten off the request path and only on a URL change.
+_SCHEMA_DIR = os.path.dirname(__file__)
+_SCHEMA_STATE = {"schema": None, "persisted_url": None}
+
+def _load_schema_cache():
+    """Load openapi.json into the in-memory cache on first use"""
+    if _SCHEMA_STATE["schema"] is None:
+        with open(os.path.join(_SCHEMA_DIR, "openapi.json"), "r") as f:
             schema = json.load(f)
-            
-        # Update the server URL
-        if "servers" in schema and len(schema["servers"]) > 0:
-            schema["servers"][0]["url"] = server_url
-            schema["servers"][0]["description"] = "Dynamic server endpoint"
-        else:
-            schema["servers"] = [{"url": server_url, "description": "Dynamic server endpoint"}]
-        
+
         # Make sure security schemes are properly defined
         if "components" not in schema:
             schema["components"] = {}
-        
+
         if "securitySchemes" not in schema["components"]:
             schema["components"]["securitySchemes"] = {
                 "ApiKeyAuth": {
@@ -293,174 +431,122 @@ async def get_openapi_schema():
                     "name": "X-API-Key"
                 }
             }
-        
+
         if "security" not in schema:
             schema["security"] = [{"ApiKeyAuth": []}]
-        
-        # Create backup before writing
-        try:
-            if os.path.exists(schema_path):
-                backup_path = f"{schema_path}.bak"
-                shutil.copy2(schema_path, backup_path)
-        except Exception as backup_error:
-            print(f"Warning: Could not create backup: {str(backup_error)}")
-            
-        # Write updated schema back to file for future use
-        with open(schema_path, "w") as f:
-            json.dump(schema, f, indent=2)
-            
-        # Also update schema.json to be in sync
-        schema_json_path = os.path.join(os.path.dirname(__file__), "schema.json")
-        try:
-            if os.path.exists(schema_json_path):
-                backup_path = f"{schema_json_path}.bak"
-                shutil.copy2(schema_json_path, backup_path)
-        except Exception as backup_error:
-            print(f"Warning: Could not create backup: {str(backup_error)}")
-            
-        with open(schema_json_path, "w") as f:
-            json.dump(schema, f, indent=2)
-            
-        return schema
+
+        _SCHEMA_STATE["schema"] = schema
+    return _SCHEMA_STATE["schema"]
+
+def _persist_schema(schema):
+    """Write the schema to both on-disk copies (runs in a thread)"""
+    payload = orjson.dumps(schema, option=orjson.OPT_INDENT_2)
+    for name in ("openapi.json", "schema.json"):
+        with open(os.path.join(_SCHEMA_DIR, name), "wb") as f:
+            f.write(payload)
+
+# Strong references to in-flight persist tasks; the event loop only
+# keeps weak ones, so an unreferenced task can be collected mid-write
+_PERSIST_TASKS = set()
+
+def _persist_done(task, url):
+    """Drop the task reference; on failure, let the next request retry"""
+    _PERSIST_TASKS.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Schema persist failed: {task.exception()}")
+        if _SCHEMA_STATE["persisted_url"] == url:
+            _SCHEMA_STATE["persisted_url"] = None
+
+async def _current_schema():
+    """Return the cached schema patched with the current server URL.
+
+    Persists to disk only when the URL actually changed, and does so in
+    a background task so the request never waits on file I/O.
+    """
+    server_url = await _get_server_url()
+
+    # Ensure server_url has proper format for RFC3986
+    if server_url and not server_url.startswith(("http://", "https://")):
+        server_url = f"https://{server_url}"
+
+    # The first call reads openapi.json from disk; run it in a worker
+    # thread so even the cold hit never stalls the loop
+    schema = await asyncio.to_thread(_load_schema_cache)
+
+    # Update the server URL
+    if "servers" in schema and len(schema["servers"]) > 0:
+        schema["servers"][0]["url"] = server_url
+        schema["servers"][0]["description"] = "Dynamic server endpoint"
+    else:
+        schema["servers"] = [{"url": server_url, "description": "Dynamic server endpoint"}]
+
+    if _SCHEMA_STATE["persisted_url"] != server_url:
+        _SCHEMA_STATE["persisted_url"] = server_url
+        task = asyncio.create_task(asyncio.to_thread(_persist_schema, schema))
+        _PERSIST_TASKS.add(task)
+        task.add_done_callback(
+            functools.partial(_persist_done, url=server_url))
+
+    return schema
+
+@app.get("/openapi.json", include_in_schema=False, response_class=ORJSONResponse)
+async def get_openapi_schema():
+    """Serve the OpenAPI schema with correct content-type headers"""
+    try:
+        return await _current_schema()
     except Exception as e:
         print(f"Error updating schema: {str(e)}")
         # Generate a new schema as fallback
-        import subprocess
         try:
             print("Generating new OpenAPI schema...")
-            subprocess.run([sys.executable, "gpt_config.py"])
-            
+            process = await asyncio.create_subprocess_exec(sys.executable, "gpt_config.py")
+            await process.wait()
+
             # Now try to read it again
-            with open(schema_path, "r") as f:
+            with open(os.path.join(_SCHEMA_DIR, "openapi.json"), "r") as f:
                 return json.load(f)
         except Exception as e:
             print(f"Error generating schema: {str(e)}")
             # Fall back to app.openapi() as last resort
             return app.openapi()
 
-@app.get("/schema.json", include_in_schema=False, response_class=JSONResponse)
+@app.get("/schema.json", include_in_schema=False, response_class=ORJSONResponse)
 async def get_schema_json():
     """Serve the schema.json file (identical to openapi.json) with correct content-type headers"""
-    # This endpoint ensures that both openapi.json and schema.json 
-    # are available and in sync with the same content
-    
-    schema_path = os.path.join(os.path.dirname(__file__), "schema.json")
-    openapi_path = os.path.join(os.path.dirname(__file__), "openapi.json")
-    
-    # Try to detect if ngrok is running for public URL
-    public_url = None
-    try:
-        response = requests.get("http://localhost:4040/api/tunnels", timeout=1)
-        data = response.json()
-        for tunnel in data.get('tunnels', []):
-            if tunnel.get('proto') == 'https':
-                public_url = tunnel.get('public_url')
-                # Ensure URL is properly formatted with no trailing whitespace
-                public_url = public_url.strip()
-                break
-    except:
-        pass
-        
-    # Get local network URL
-    local_url = "http://localhost:8000"
-    network_url = local_url
-    
-    try:
-        hostname = socket.gethostname()
-        local_ip = socket.gethostbyname(hostname)
-        network_url = f"http://{local_ip}:8000"
-    except:
-        pass
-    
-    # Determine the URL to use
-    server_url = public_url if public_url else network_url
-    
-    # Ensure server_url has proper format for RFC3986
-    if server_url and not server_url.startswith(("http://", "https://")):
-        server_url = f"https://{server_url}"
-    
+    # Both endpoints serve the same cached document, which keeps
+    # openapi.json and schema.json in sync by construction
     try:
-        # Check if schema.json exists, if not create it from openapi.json
-        if not os.path.exists(schema_path) and os.path.exists(openapi_path):
-            with open(openapi_path, "r") as f:
-                schema = json.load(f)
-                
-            # Update the server URL
-            if "servers" in schema and len(schema["servers"]) > 0:
-                schema["servers"][0]["url"] = server_url
-                schema["servers"][0]["description"] = "Dynamic server endpoint"
-            else:
-                schema["servers"] = [{"url": server_url, "description": "Dynamic server endpoint"}]
-            
-            # Make sure security schemes are properly defined
-            if "components" not in schema:
-                schema["components"] = {}
-            
-            if "securitySchemes" not in schema["components"]:
-                schema["components"]["securitySchemes"] = {
-                    "ApiKeyAuth": {
-                        "type": "apiKey",
-                        "in": "header",
-                        "name": "X-API-Key"
-                    }
-                }
-            
-            if "security" not in schema:
-                schema["security"] = [{"ApiKeyAuth": []}]
-            
-            with open(schema_path, "w") as f:
-                json.dump(schema, f, indent=2)
-        else:
-            # If schema.json exists, update it with the current server URL
-            with open(schema_path, "r") as f:
-                schema = json.load(f)
-                
-            # Update the server URL
-            if "servers" in schema and len(schema["servers"]) > 0:
-                schema["servers"][0]["url"] = server_url
-            else:
-                schema["servers"] = [{"url": server_url, "description": "Dynamic server endpoint"}]
-                
-            # Write the updated schema
-            with open(schema_path, "w") as f:
-                json.dump(schema, f, indent=2)
-        
-        # Read and return the schema
-        with open(schema_path, "r") as f:
-            return json.load(f)
+        return await _current_schema()
     except Exception as e:
-        # If schema.json doesn't exist or can't be read, redirect to openapi.json
+        # If the schema can't be loaded, redirect to openapi.json which
+        # can regenerate it
         print(f"Error serving schema.json: {str(e)}")
         return RedirectResponse(url="/openapi.json")
 
 @app.get("/simple-schema.json", include_in_schema=False)
 async def get_simple_schema():
     """Serve a barebones OpenAPI schema that works reliably with ChatGPT"""
-    # Try to detect if ngrok is running for public URL
-    public_url = None
-    try:
-        response = requests.get("http://localhost:4040/api/tunnels", timeout=1)
-        data = response.json()
-        for tunnel in data.get('tunnels', []):
-            if tunnel.get('proto') == 'https':
-                public_url = tunnel.get('public_url')
-                break
-    except:
-        pass
-        
     # Use ngrok URL if available, otherwise use local URL
+    public_url = await _get_public_url()
     server_url = public_url if public_url else "http://localhost:8000"
     
     # Read the simplified schema template
     schema_path = os.path.join(os.path.dirname(__file__), "simple_schema.json")
     
     try:
-        with open(schema_path, "r") as f:
-            schema = json.load(f)
-            
+        # One unbuffered open/fstat/read/close instead of the
+        # BufferedReader + TextIOWrapper stack; the file is small enough
+        # that a single os.read always returns it whole
+        fd = os.open(schema_path, os.O_RDONLY)
+        try:
+            schema_bytes = os.read(fd, os.fstat(fd).st_size)
+        finally:
+            os.close(fd)
+        schema = orjson.loads(schema_bytes)
+
         # Update the server URL
         schema["servers"][0]["url"] = server_url
-        
+
         return schema
     except Exception as e:
         print(f"Error serving simple schema: {str(e)}")
@@ -469,31 +555,21 @@ async def get_simple_schema():
 @app.get("/schema-for-gpt", include_in_schema=False)
 async def get_gpt_specific_schema():
     """Serve a specially formatted OpenAPI schema optimized for ChatGPT Custom GPT"""
-    # Try to detect if ngrok is running for public URL
-    public_url = None
-    try:
-        response = requests.get("http://localhost:4040/api/tunnels", timeout=1)
-        data = response.json()
-        for tunnel in data.get('tunnels', []):
-            if tunnel.get('proto') == 'https':
-                public_url = tunnel.get('public_url')
-                break
-    except:
-        pass
-        
-    # Get local network URL as fallback
-    local_url = "http://localhost:8000"
-    network_url = local_url
-    try:
-        hostname = socket.gethostname()
-        local_ip = socket.gethostbyname(hostname)
-        network_url = f"http://{local_ip}:8000"
-    except:
-        pass
-    
     # Use ngrok URL if available, otherwise use local URL
-    server_url = public_url if public_url else network_url
-    
+    server_url = await _get_server_url()
+
+    # Serve cached pre-serialized bytes; the payload only varies with
+    # the server URL, so rebuilding and re-encoding the dict per request
+    # is wasted work
+    return Response(_gpt_schema_bytes(server_url), media_type="application/json")
+
+# Sentinel patched into the pre-serialized schema; the server URL is
+# the only field that varies between requests
+_GPT_SCHEMA_URL_SENTINEL = "__SERVER_URL__"
+
+@functools.lru_cache(maxsize=1)
+def _gpt_schema_template_bytes() -> bytes:
+    """Build and serialize the GPT-optimized schema exactly once"""
     # This is a simplified schema that works reliably with Custom GPT
     schema = {
         "openapi": "3.1.0",
@@ -504,7 +580,7 @@ async def get_gpt_specific_schema():
         },
         "servers": [
             {
-                "url": server_url
+                "url": _GPT_SCHEMA_URL_SENTINEL
             }
         ],
         "paths": {
@@ -655,102 +731,198 @@ async def get_gpt_specific_schema():
             }
         ]
     }
-    
-    return schema
 
-# Database Setup
-engine = create_engine('sqlite:///localdb.sqlite3')
-SessionLocal = sessionmaker(bind=engine)
+    return orjson.dumps(schema)
+
+@functools.lru_cache(maxsize=8)
+def _gpt_schema_bytes(server_url: str) -> bytes:
+    """Patch the cached schema bytes with one server URL"""
+    return _gpt_schema_template_bytes().replace(
+        _GPT_SCHEMA_URL_SENTINEL.encode("ascii"), server_url.encode("utf-8"))
+
+# Database Setup; the async engine keeps SQLite I/O off the event loop.
+# The URL is overridable so tests can point at a throwaway file
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///localdb.sqlite3")
+
+engine = create_async_engine(
+    DATABASE_URL,
+    pool_pre_ping=True,
+    pool_size=5,
+    max_overflow=10
+)
+
+@event.listens_for(engine.sync_engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Tune each new SQLite connection.
+
+    WAL lets readers proceed during writes and cuts fsync cost per
+    commit; synchronous=NORMAL is safe under WAL; temp_store and mmap
+    keep temporary data and reads out of syscalls.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.close()
+
+# expire_on_commit off so returned objects stay usable after commit
+# without an implicit re-fetch
+SessionLocal = async_sessionmaker(bind=engine, expire_on_commit=False)
 Base = declarative_base()
 
+# Table creation is deferred out of import time so importing the module
+# (tests, tooling, forked workers) stays side-effect-free; the guard
+# makes it run at most once per process
+_db_initialized = False
+
+async def _ensure_db():
+    """Create the tables once per process, on first database use"""
+    global _db_initialized
+    if not _db_initialized:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        _db_initialized = True
+
+@app.on_event("startup")
+async def _init_db():
+    await _ensure_db()
+
+async def get_db():
+    """Yield a request-scoped database session, closed afterwards"""
+    await _ensure_db()
+    async with SessionLocal() as db:
+        yield db
+
 class Item(Base):
     __tablename__ = 'items'
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, index=True)
     description = Column(String)
 
-Base.metadata.create_all(bind=engine)
-
 class ItemSchema(BaseModel):
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
     name: str
     description: str
 
 # Request models
 class CommandRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
     command: str = Field(..., description="CLI command to execute")
 
 class FileReadRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
     path: str = Field(..., description="Path to the file to read")
 
 class FileWriteRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
     path: str = Field(..., description="Path where to write the file")
     content: str = Field(..., description="Content to write to the file")
 
 # Unified API endpoint for all operations
 class ApiRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
     operation: str = Field(..., description="Operation to perform: cli, read_file, write_file, create_item, get_item")
     params: Dict[str, Any] = Field(default={}, description="Parameters for the operation")
 
+# Per-operation adapters for /api; the dispatch table below maps each
+# operation name to its adapter and the params it cannot run without
+async def _op_cli(params, session):
+    return await _do_cli(params["command"])
+
+async def _op_read_file(params, session):
+    return await _do_read_file(params["path"])
+
+async def _op_write_file(params, session):
+    # params were validated once as part of ApiRequest; the _do_ helper
+    # takes them raw rather than paying a second Pydantic pass
+    return await _do_write_file(params["path"], params["content"])
+
+async def _op_create_item(params, session):
+    return await _do_create_item(params["name"], params["description"], session)
+
+async def _op_get_item(params, session):
+    return await get_item(params.get("item_id", 0), session=session)
+
+# Operation dispatch table; one hash lookup replaces the if/elif walk
+_OPERATIONS = {
+    "cli": (_op_cli, frozenset({"command"})),
+    "read_file": (_op_read_file, frozenset({"path"})),
+    "write_file": (_op_write_file, frozenset({"path", "content"})),
+    "create_item": (_op_create_item, frozenset({"name", "description"})),
+    "get_item": (_op_get_item, frozenset()),
+}
+
 @app.post("/api")
-async def unified_api(request: ApiRequest, api_key: str = Depends(api_key_header)):
-    # Validate API key
-    if api_key != Config.API_KEY:
-        raise HTTPException(status_code=403, detail="Invalid API Key")
-    
-    # Log the request for debugging
-    print(f"API REQUEST: Operation={request.operation}, Params={request.params}")
-        
+async def unified_api(request: ApiRequest, session: AsyncSession = Depends(get_db)):
+    entry = _OPERATIONS.get(request.operation)
+    if entry is None:
+        raise HTTPException(status_code=400, detail=f"Unknown operation: {request.operation}")
+
+    handler, required = entry
+    missing = required - request.params.keys()
+    if missing:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Missing parameters for {request.operation} operation: {', '.join(sorted(missing))}"
+        )
+
     try:
-        # Route to appropriate handler based on operation
-        if request.operation == "cli":
-            # Ensure command parameter exists
-            if "command" not in request.params:
-                raise HTTPException(status_code=400, detail="Missing 'command' parameter for CLI operation")
-            return await run_cli(request.params.get("command", ""))
-        elif request.operation == "read_file":
-            if "path" not in request.params:
-                raise HTTPException(status_code=400, detail="Missing 'path' parameter for read_file operation")
-            return await read_file(request.params.get("path", ""))
-        elif request.operation == "write_file":
-            return await write_file(FileWriteRequest(**request.params))
-        elif request.operation == "create_item":
-            return await create_item(ItemSchema(**request.params))
-        elif request.operation == "get_item":
-            return await get_item(request.params.get("item_id", 0))
-        else:
-            raise HTTPException(status_code=400, detail=f"Unknown operation: {request.operation}")
+        return await handler(request.params, session)
     except Exception as e:
         # More detailed error logging
-        print(f"API ERROR: {str(e)}")
+        logger.error("API ERROR: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
 
 # Individual endpoints (still available for direct use)
-# Support both GET and POST for CLI commands for better compatibility
-@app.post("/cli")
-@app.get("/cli")
-async def run_cli(
-    command: str, 
-    format: str = "json", 
-    request: Request = None,
-    api_key: str = Header(None, alias="X-API-Key"),
-    apiKey: str = None  # For query parameter from form
-):
-    # Handle API key from either header or query param
-    key = api_key or apiKey
-    if not key or key != Config.API_KEY:
-        raise HTTPException(status_code=403, detail="Invalid API Key")
+async def _do_cli(command: str, format: str = "json", request: Request = None,
+                  verbose: bool = True):
+    """Execute a CLI command; shared by /cli and the unified /api route"""
     # Security check based on configuration
     if not Config.is_command_allowed(command):
         raise HTTPException(status_code=403, detail="Command not allowed due to security restrictions")
     
-    process = Popen(command, shell=True, stdout=PIPE, stderr=PIPE, text=True)
-    stdout, stderr = process.communicate()
-    
-    # Log output for debugging
-    print(f"COMMAND: {command}")
-    print(f"STDOUT: {stdout}")
-    print(f"STDERR: {stderr}")
-    
+    # Run without a shell so the event loop is never blocked and shell
+    # injection is off the table; the command is tokenized with shlex
+    try:
+        argv = shlex.split(command)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid command: {str(e)}")
+    if not argv:
+        raise HTTPException(status_code=400, detail="Empty command")
+
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *argv,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+    except FileNotFoundError:
+        raise HTTPException(status_code=400, detail=f"Command not found: {argv[0]}")
+
+    try:
+        stdout_bytes, stderr_bytes = await asyncio.wait_for(
+            process.communicate(), timeout=CLI_TIMEOUT
+        )
+    except asyncio.TimeoutError:
+        process.kill()
+        raise HTTPException(status_code=504, detail=f"Command timed out after {CLI_TIMEOUT}s")
+
+    stdout = stdout_bytes.decode("utf-8", errors="replace")
+    stderr = stderr_bytes.decode("utf-8", errors="replace")
+
+    # Log output for debugging; the guard keeps production requests from
+    # paying for formatting (or copying a large stdout) at all
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("COMMAND: %s", command)
+        logger.debug("STDOUT: %s", stdout[:4096])
+        logger.debug("STDERR: %s", stderr[:4096])
+
     # Handle case where command executes but produces no output
     if not stdout and not stderr:
         return {
@@ -789,8 +961,12 @@ The command `{command}` produced a warning:
         }
         return wrapped_output
     
-    # Normal case - return the enhanced command output with context
-    wrapped_output = OutputWrapper.wrap_cli_output(command, stdout.strip())
+    # Normal case - return the enhanced command output with context.
+    # The HTML page renders suggested_response, so it is always built
+    # there; JSON clients can opt out with verbose=false
+    wrapped_output = OutputWrapper.wrap_cli_output(
+        command, stdout.strip(),
+        include_suggested=verbose or format.lower() == "html")
     
     # Add LLM guidance to prevent hallucinations
     enhanced_output = LLMPromptFormatter.enhance_api_response(wrapped_output, "cli")
@@ -798,7 +974,8 @@ The command `{command}` produced a warning:
     # Return as HTML if requested
     if format.lower() == "html" and request is not None:
         suggested = enhanced_output.get("suggested_response", "")
-        structured = json.dumps(enhanced_output.get("structured_output", {}), indent=2)
+        structured = orjson.dumps(
+            enhanced_output.get("structured_output", {}), option=orjson.OPT_INDENT_2).decode("utf-8")
         
         return templates.TemplateResponse(
             "middleware_response.html",
@@ -813,31 +990,65 @@ The command `{command}` produced a warning:
     
     return enhanced_output
 
-@app.get("/read-file")
-async def read_file(
-    path: str, 
-    format: str = "json", 
-    request: Request = None,
-    api_key: str = Header(None, alias="X-API-Key"),
-    apiKey: str = None  # For query parameter from form
-):
-    # Handle API key from either header or query param
-    key = api_key or apiKey
-    if not key or key != Config.API_KEY:
-        raise HTTPException(status_code=403, detail="Invalid API Key")
+# Support both GET and POST for CLI commands for better compatibility
+@app.post("/cli")
+@app.get("/cli")
+async def run_cli(command: str, format: str = "json", request: Request = None,
+                  verbose: bool = True):
+    return await _do_cli(command, format, request, verbose)
+
+async def _do_read_file(path: str, format: str = "json", request: Request = None,
+                        raw: bool = False, verbose: bool = True):
+    """Read a file; shared by /read-file and the unified /api route"""
     # Security check based on configuration
     if not Config.is_path_allowed(path):
         raise HTTPException(status_code=403, detail="Path access restricted due to security settings")
-    
+
     if not os.path.isfile(path):
         raise HTTPException(status_code=404, detail="File not found")
-    
+
+    # raw=true skips the JSON envelope entirely; FileResponse hands the
+    # file to the server's sendfile path with no userspace copies
+    if raw:
+        return FileResponse(path, media_type="text/plain")
+
+    # Weak validator from the stat the size check needs anyway; a
+    # matching If-None-Match short-circuits before any read, wrap or
+    # encode work happens
+    st = os.stat(path)
+    file_size = st.st_size
+    etag = f'W/"{st.st_size:x}-{st.st_mtime_ns:x}"'
+    if request is not None and request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    # Large files are streamed in chunks instead of being read into one
+    # string and JSON-escaped; small files keep the JSON envelope
+    if file_size > STREAM_THRESHOLD and format.lower() != "html":
+        async def file_iter():
+            async with aiofiles.open(path, 'rb') as file:
+                while chunk := await file.read(STREAM_THRESHOLD):
+                    yield chunk
+
+        return StreamingResponse(
+            file_iter(),
+            media_type="application/octet-stream",
+            headers={"Content-Length": str(file_size), "ETag": etag}
+        )
+
     try:
-        with open(path, 'r', encoding='utf-8') as file:
-            content = file.read()
-        
-        # Return enhanced file content with context
-        wrapped_content = OutputWrapper.wrap_file_read_output(path, content)
+        async with aiofiles.open(path, 'rb') as file:
+            content_bytes = await file.read()
+
+        # Count newlines on the raw byte buffer (memchr under the hood)
+        # before paying the one decode the response body needs anyway
+        newline_count = content_bytes.count(b'\n')
+        content = content_bytes.decode('utf-8')
+
+        # Return enhanced file content with context; verbose=false skips
+        # building the suggested_response text (the HTML page needs it)
+        wrapped_content = OutputWrapper.wrap_file_read_output(
+            path, content, newline_count,
+            include_suggested=verbose or format.lower() == "html")
         
         # Add LLM guidance to prevent hallucinations
         enhanced_content = LLMPromptFormatter.enhance_api_response(wrapped_content, "file_read")
@@ -845,7 +1056,8 @@ async def read_file(
         # Return as HTML if requested
         if format.lower() == "html" and request is not None:
             suggested = enhanced_content.get("suggested_response", "")
-            structured = json.dumps(enhanced_content.get("structured_output", {}), indent=2)
+            structured = orjson.dumps(
+                enhanced_content.get("structured_output", {}), option=orjson.OPT_INDENT_2).decode("utf-8")
             
             return templates.TemplateResponse(
                 "middleware_response.html",
@@ -857,120 +1069,192 @@ async def read_file(
                     "suggested_response": suggested
                 }
             )
-        
-        return enhanced_content
+
+        # Carry the validator so the next read of an unchanged file can
+        # be answered with the 304 above
+        return ORJSONResponse(enhanced_content, headers={"ETag": etag})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to read file: {str(e)}")
 
-@app.post("/write-file", dependencies=[Depends(verify_api_key)])
-async def write_file(data: FileWriteRequest):
+@app.get("/read-file")
+async def read_file(path: str, format: str = "json", request: Request = None,
+                    raw: bool = False, verbose: bool = True):
+    return await _do_read_file(path, format, request, raw, verbose)
+
+@app.get("/read-file-raw")
+async def read_file_raw(path: str):
+    """Stream a file back as raw bytes instead of a JSON body.
+
+    Unlike /read-file this never loads the whole file into memory, so it
+    stays constant-memory for multi-MB transfers.
+    """
     # Security check based on configuration
-    if not Config.is_path_allowed(data.path):
+    if not Config.is_path_allowed(path):
         raise HTTPException(status_code=403, detail="Path access restricted due to security settings")
-    
+
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="File not found")
+
+    return FileResponse(path, media_type="application/octet-stream", filename=os.path.basename(path))
+
+@app.post("/write-file-raw")
+async def write_file_raw(path: str, request: Request):
+    """Write a file from a streamed application/octet-stream body.
+
+    The body is consumed chunk by chunk, so large uploads never occupy
+    more than one chunk of memory at a time.
+    """
+    # Security check based on configuration
+    if not Config.is_path_allowed(path):
+        raise HTTPException(status_code=403, detail="Path access restricted due to security settings")
+
     try:
         # Create directory if it doesn't exist
-        directory = os.path.dirname(data.path)
-        if directory and not os.path.exists(directory):
-            os.makedirs(directory)
-            
-        with open(data.path, 'w', encoding='utf-8') as file:
-            file.write(data.content)
-        return {"status": "success", "path": data.path}
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        async with aiofiles.open(path, 'wb') as file:
+            async for chunk in request.stream():
+                await file.write(chunk)
+        return {"status": "success", "path": path}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to write file: {str(e)}")
+
+async def _do_write_file(path: str, content: str):
+    """Write a file; shared by /write-file and the unified /api route"""
+    # Security check based on configuration
+    if not Config.is_path_allowed(path):
+        raise HTTPException(status_code=403, detail="Path access restricted due to security settings")
+
+    try:
+        # Create directory if it doesn't exist; exist_ok folds the
+        # stat+mkdir pair into one call and closes the TOCTOU window
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        async with aiofiles.open(path, 'w', encoding='utf-8') as file:
+            await file.write(content)
+        return {"status": "success", "path": path}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to write file: {str(e)}")
 
+@app.post("/write-file")
+async def write_file(data: FileWriteRequest):
+    return await _do_write_file(data.path, data.content)
+
 # Database CRUD endpoints
-@app.post("/items", dependencies=[Depends(verify_api_key)])
-async def create_item(item: ItemSchema):
+async def _do_create_item(name: str, description: str, session: AsyncSession):
+    """Create one item; shared by /items and the unified /api route"""
     try:
-        session = SessionLocal()
-        db_item = Item(name=item.name, description=item.description)
+        db_item = Item(name=name, description=description)
         session.add(db_item)
-        session.commit()
-        session.refresh(db_item)
-        
+        await session.commit()
+        await session.refresh(db_item)
+
         # Convert to dict for JSON serialization
-        result = {
+        return {
             "id": db_item.id,
             "name": db_item.name,
             "description": db_item.description
         }
-        
-        session.close()
-        return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
-@app.get("/items/{item_id}", dependencies=[Depends(verify_api_key)])
-async def get_item(item_id: int):
+@app.post("/items")
+async def create_item(item: ItemSchema, session: AsyncSession = Depends(get_db)):
+    return await _do_create_item(item.name, item.description, session)
+
+@app.post("/items/batch")
+async def create_items_batch(items: List[ItemSchema], session: AsyncSession = Depends(get_db)):
+    """Create many items in one transaction.
+
+    A single Core insert executed with a list of parameter dicts runs as
+    one executemany in one transaction — no per-row ORM bookkeeping, no
+    per-row commit or fsync like the single-item endpoint pays.
+    """
     try:
-        session = SessionLocal()
-        item = session.query(Item).filter(Item.id == item_id).first()
-        session.close()
-        
+        await session.execute(
+            insert(Item),
+            [{"name": item.name, "description": item.description} for item in items]
+        )
+        await session.commit()
+        return {"status": "success", "count": len(items)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+@app.get("/items/{item_id}")
+async def get_item(item_id: int, session: AsyncSession = Depends(get_db)):
+    try:
+        # Primary-key lookup: session.get skips query compilation and can
+        # be served straight from the identity map
+        item = await session.get(Item, item_id)
+
         if not item:
             raise HTTPException(status_code=404, detail="Item not found")
-            
+
         # Convert to dict for JSON serialization
         return {
             "id": item.id,
             "name": item.name,
             "description": item.description
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 # GPT Action Configuration Endpoint
-# Set up Jinja2 templates
-templates = Jinja2Templates(directory="templates")
+# Set up Jinja2 templates; auto_reload is off so rendering never
+# re-stats the template files, the plain-dict cache keeps every
+# compiled template for the life of the process, and the bytecode cache
+# lets restarted workers skip recompilation entirely. The zero-argument
+# FileSystemBytecodeCache builds a per-uid 0700 directory and verifies
+# its ownership; a fixed name in /tmp could be pre-created by another
+# local user, who could then plant marshal payloads
+templates = Jinja2Templates(env=jinja2.Environment(
+    loader=jinja2.FileSystemLoader("templates"),
+    bytecode_cache=jinja2.FileSystemBytecodeCache(),
+    auto_reload=False,
+    autoescape=True,
+))
+templates.env.cache = {}
+
+# Warm the cache at import so the first request pays no compile cost
+for _template_name in ("middleware_response.html", "setup.html", "test_form.html"):
+    try:
+        templates.env.get_template(_template_name)
+    except Exception:
+        # A missing template surfaces on first use, as before
+        pass
+
+@functools.lru_cache(maxsize=8)
+def _setup_schema_json(server_url: str) -> str:
+    """Pretty-print the cached schema for the setup page, per URL.
+
+    The URL key means the multi-KB re-serialization only happens when
+    the detected server URL changes, not per page view; _current_schema
+    has already patched the cached dict before this runs.
+    """
+    return orjson.dumps(_load_schema_cache(), option=orjson.OPT_INDENT_2).decode("utf-8")
 
 @app.get("/setup-gpt", response_class=HTMLResponse)
 async def setup_gpt(request: Request):
     """Provide a user-friendly web page for setting up a Custom GPT"""
-    # Try to detect if ngrok is running for public URL
-    public_url = None
-    try:
-        response = requests.get("http://localhost:4040/api/tunnels", timeout=1)
-        data = response.json()
-        for tunnel in data.get('tunnels', []):
-            if tunnel.get('proto') == 'https':
-                public_url = tunnel.get('public_url')
-                # Ensure URL is properly formatted with no trailing whitespace
-                public_url = public_url.strip()
-                break
-    except:
-        pass
-        
-    # Get local network URL
+    public_url = await _get_public_url()
     local_url = "http://localhost:8000"
-    network_url = local_url
-    hostname = socket.gethostname()
-    try:
-        local_ip = socket.gethostbyname(hostname)
-        network_url = f"http://{local_ip}:8000"
-    except:
-        pass
-    
+    network_url = _get_network_url()
+
     # Ensure URLs have proper format for RFC3986
     if public_url and not public_url.startswith(("http://", "https://")):
         public_url = f"https://{public_url}"
-    
-    # Get OpenAPI schema
-    schema_path = os.path.join(os.path.dirname(__file__), "openapi.json")
+
+    # Get OpenAPI schema from the in-memory cache; no file read or
+    # JSON parse on the request path
     try:
-        with open(schema_path, "r") as f:
-            schema = json.load(f)
-            
-        # Ensure schema has proper server URL
-        if "servers" in schema and len(schema["servers"]) > 0:
-            if public_url:
-                schema["servers"][0]["url"] = public_url
-            else:
-                schema["servers"][0]["url"] = network_url
-                
-        # Convert to JSON string for template
-        schema_json = json.dumps(schema, indent=2)
+        schema = await _current_schema()
+        schema_json = _setup_schema_json(schema["servers"][0]["url"])
     except:
         # Generate schema if it doesn't exist
         openapi_schema = app.openapi()
@@ -983,7 +1267,16 @@ async def setup_gpt(request: Request):
         # Save for future use
         with open("openapi.json", "w") as f:
             f.write(schema_json)
-    
+
+    # The page only varies with the schema and detected URL, so a weak
+    # validator over those lets an unchanged revisit skip the template
+    # render entirely; a keyed-off digest (not the builtin hash, which
+    # is salted per process) keeps the validator stable across restarts
+    # and between workers
+    etag = f'W/"{hashlib.blake2b(f"{public_url}{schema_json}".encode(), digest_size=8).hexdigest()}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
     # Render the HTML template
     return templates.TemplateResponse(
         "setup.html", 
@@ -994,5 +1287,21 @@ async def setup_gpt(request: Request):
             "public_url": public_url,
             "api_key": Config.API_KEY,
             "schema_json": schema_json
-        }
+        },
+        headers={"ETag": etag}
     )
+
+if __name__ == "__main__":
+    import uvicorn
+
+    # uvicorn[standard] ships uvloop and httptools; request them
+    # explicitly so a direct `python main.py` launch never silently
+    # falls back to the slower stdlib loop and h11 parser
+    try:
+        import uvloop  # noqa: F401
+        loop = "uvloop"
+    except ImportError:
+        # uvloop does not support Windows; asyncio is the fallback there
+        loop = "asyncio"
+
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, loop=loop, http="httptools")
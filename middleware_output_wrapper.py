@@ -6,9 +6,23 @@ This module adds contextual information to CLI and file operation outputs
 to help LLMs avoid hallucinations or misrepresentations.
 """
 
+import io
 import os
-import re
-from typing import Dict, Any, Optional
+import itertools
+from typing import Any, Dict, List, Optional
+
+# Extension-to-type labels for file read context; built once instead of
+# rebuilding membership lists on every call
+_EXT_TO_TYPE = {
+    ".json": "json/javascript",
+    ".js": "json/javascript",
+    ".py": "python",
+    ".md": "markdown",
+    ".csv": "csv/tabular data",
+    ".tsv": "csv/tabular data",
+    ".html": "html",
+    ".htm": "html",
+}
 
 class OutputWrapper:
     """
@@ -16,28 +30,33 @@ class OutputWrapper:
     """
     
     @staticmethod
-    def wrap_cli_output(command: str, output: str) -> Dict[str, Any]:
+    def wrap_cli_output(command: str, output: str, include_suggested: bool = True) -> Dict[str, Any]:
         """
         Enhance CLI command output with useful context to prevent hallucinations
-        
+
         Args:
             command: The CLI command that was executed
             output: The raw output from the command
-            
+            include_suggested: Build the multi-line suggested_response
+                text; machine clients that only read structured_output
+                can turn this off to skip the string assembly
+
         Returns:
             Dict with enhanced output including context
         """
-        # Extract key information from the command
-        cmd_parts = command.strip().split()
+        # Tokenize once here and thread the list into the helpers; split
+        # with no arguments already collapses surrounding whitespace, so
+        # the strip pass is unnecessary
+        cmd_parts = command.split()
         base_cmd = cmd_parts[0] if cmd_parts else ""
-        
+
         # Add special handling for common commands
         if base_cmd == "ls":
-            return OutputWrapper._enhance_ls_output(command, output)
+            return OutputWrapper._enhance_ls_output(command, cmd_parts, output, include_suggested)
         elif base_cmd in ["cat", "head", "tail"]:
-            return OutputWrapper._enhance_file_read_output(command, output)
+            return OutputWrapper._enhance_file_read_output(command, cmd_parts, output)
         elif base_cmd == "find":
-            return OutputWrapper._enhance_find_output(command, output)
+            return OutputWrapper._enhance_find_output(command, cmd_parts, output)
         else:
             # Default enhancement for other commands
             return {
@@ -50,10 +69,10 @@ class OutputWrapper:
             }
     
     @staticmethod
-    def _enhance_ls_output(command: str, output: str) -> Dict[str, Any]:
+    def _enhance_ls_output(command: str, cmd_parts: List[str], output: str,
+                           include_suggested: bool = True) -> Dict[str, Any]:
         """Enhance ls command output with directory context"""
-        # Determine target directory from the command
-        cmd_parts = command.strip().split()
+        # Determine target directory from the pre-tokenized command
         target_dir = None
         
         # Look for a path in the command (simple approach)
@@ -69,36 +88,40 @@ class OutputWrapper:
             else:
                 target_dir = "Current directory"
                 
-        # Parse output to distinguish files from directories
-        lines = output.strip().split("\n")
+        # Parse output in a single pass, building both the name lists
+        # and their bullet lines as lines are classified
         files = []
         dirs = []
+        file_bullets = []
+        dir_bullets = []
         other_entries = []
-        
-        for line in lines:
+
+        for line in io.StringIO(output.strip()):
+            line = line.rstrip("\n")
             if not line.strip():
                 continue
-                
-            # Most ls -l output formats have permissions at the start
-            if re.search(r'^d\S+', line):  # Directory
-                parts = line.split()
-                if len(parts) >= 9:
-                    name = " ".join(parts[8:])
-                    dirs.append(name)
-            elif re.search(r'^-\S+', line):  # File
-                parts = line.split()
+
+            # Most ls -l output formats have permissions at the start;
+            # plain string checks ('d'/'-' then a non-space permission
+            # char) classify a line without invoking the regex engine.
+            # The bounded split stops after the 8 metadata columns, so
+            # the name is extracted without tokenizing the whole line
+            first = line[:1]
+            if first in ('d', '-') and not line[1:2].isspace():
+                parts = line.split(None, 8)
                 if len(parts) >= 9:
-                    name = " ".join(parts[8:])
-                    files.append(name)
+                    name = parts[8]
+                    if first == 'd':
+                        dirs.append(name)
+                        dir_bullets.append(f"- {name}")
+                    else:
+                        files.append(name)
+                        file_bullets.append(f"- {name}")
             else:
                 other_entries.append(line)
-        
-        # Create structured file list for clarity
-        file_list_str = "\n".join([f"- {file}" for file in files])
-        dir_list_str = "\n".join([f"- {d}" for d in dirs])
-        
+
         # Create a very explicit, structured response that's harder to misrepresent
-        return {
+        wrapped = {
             "output": output,
             "context": {
                 "command_executed": command,
@@ -113,7 +136,15 @@ class OutputWrapper:
                 "subdirectories_in_this_directory": dirs
             },
             "warning": "IMPORTANT: The files and directories listed above exist ONLY in the exact directory path specified, not in parent or other directories. Any output suggesting these files exist elsewhere is incorrect.",
-            "suggested_response": f"""
+        }
+
+        # The suggested text repeats every name already present in
+        # structured_output; callers that only read the structured form
+        # skip both joins and the template build entirely
+        if include_suggested:
+            file_list_str = "\n".join(file_bullets)
+            dir_list_str = "\n".join(dir_bullets)
+            wrapped["suggested_response"] = f"""
 Directory listing for: {target_dir}
 
 Files found directly in this directory ({len(files)}):
@@ -124,13 +155,12 @@ Subdirectories found directly in this directory ({len(dirs)}):
 
 Note: These files and directories exist ONLY in the specific path shown above, not in parent directories.
 """
-        }
+        return wrapped
     
     @staticmethod
-    def _enhance_file_read_output(command: str, output: str) -> Dict[str, Any]:
+    def _enhance_file_read_output(command: str, cmd_parts: List[str], output: str) -> Dict[str, Any]:
         """Enhance file reading command output with file context"""
-        # Extract filename from command
-        cmd_parts = command.strip().split()
+        # Extract filename from the pre-tokenized command
         filename = None
         
         for part in cmd_parts:
@@ -152,10 +182,9 @@ Note: These files and directories exist ONLY in the specific path shown above, n
         }
     
     @staticmethod
-    def _enhance_find_output(command: str, output: str) -> Dict[str, Any]:
+    def _enhance_find_output(command: str, cmd_parts: List[str], output: str) -> Dict[str, Any]:
         """Enhance find command output with search context"""
-        # Extract search path and pattern
-        cmd_parts = command.strip().split()
+        # Extract search path and pattern from the pre-tokenized command
         search_path = "Current directory"
         search_pattern = None
         
@@ -181,68 +210,82 @@ Note: These files and directories exist ONLY in the specific path shown above, n
         }
     
     @staticmethod
-    def wrap_file_read_output(path: str, content: str) -> Dict[str, Any]:
+    def wrap_file_read_output(path: str, content: str, newline_count: Optional[int] = None,
+                              include_suggested: bool = True) -> Dict[str, Any]:
         """
         Enhance file read output with useful context
-        
+
         Args:
             path: The path of the file that was read
             content: The content of the file
-            
+            newline_count: Newline count if the caller already has it
+                (e.g. counted on the raw bytes before decoding)
+            include_suggested: Build the suggested_response text with its
+                content slice; machine clients can turn this off
+
         Returns:
             Dict with enhanced output including context
         """
         file_size = len(content)
-        file_ext = os.path.splitext(path)[1].lower() if "." in os.path.basename(path) else "none"
-        
+        # Counted once and reused below; on a multi-MB file each count
+        # is a full scan
+        if newline_count is None:
+            newline_count = content.count('\n')
+        line_count = newline_count + 1
+        # Path derivations are needed several times below; resolve each
+        # one once rather than re-walking the path per field
+        abs_path = os.path.abspath(path)
+        base_name = os.path.basename(path)
+        dir_name = os.path.dirname(abs_path)
+        # splitext already returns "" when there is no extension
+        file_ext = os.path.splitext(path)[1].lower() or "none"
+
         # Special handling for different file types
-        file_type = "text"
-        if file_ext in [".json", ".js"]:
-            file_type = "json/javascript"
-        elif file_ext in [".py"]:
-            file_type = "python"
-        elif file_ext in [".md"]:
-            file_type = "markdown"
-        elif file_ext in [".csv", ".tsv"]:
-            file_type = "csv/tabular data"
-        elif file_ext in [".html", ".htm"]:
-            file_type = "html"
-            
-        # Get the first few lines for quick preview
-        preview_lines = content.split('\n')[:5]
+        file_type = _EXT_TO_TYPE.get(file_ext, "text")
+
+        # Get the first few lines for quick preview; slicing a line
+        # iterator keeps this O(preview) instead of splitting the whole
+        # content into one list per line
+        preview_lines = [line.rstrip('\n') for line in itertools.islice(io.StringIO(content), 5)]
         preview = '\n'.join(preview_lines)
-        if len(preview_lines) < content.count('\n'):
+        if len(preview_lines) < newline_count:
             preview += "\n[...]"
         
-        return {
+        wrapped = {
             "content": content,
             "context": {
-                "file_path": os.path.abspath(path),
-                "file_name": os.path.basename(path),
+                "file_path": abs_path,
+                "file_name": base_name,
                 "file_size_bytes": file_size,
-                "line_count": content.count('\n') + 1,
+                "line_count": line_count,
                 "file_type": file_type
             },
             "structured_output": {
-                "file": os.path.basename(path),
-                "exact_location": os.path.abspath(path),
-                "directory": os.path.dirname(os.path.abspath(path)),
+                "file": base_name,
+                "exact_location": abs_path,
+                "directory": dir_name,
                 "preview": preview
             },
             "warning": "IMPORTANT: This file exists ONLY at the exact path specified. The content shown is from that specific file. Any output suggesting this content exists in a different file is incorrect.",
-            "suggested_response": f"""
-File: {os.path.basename(path)}
-Location: {os.path.abspath(path)}
-Type: {file_type}
-Size: {file_size} bytes
-Lines: {content.count('\n') + 1}
-
-Content of {os.path.basename(path)}:
-```
-{content[:1000]}{'...' if len(content) > 1000 else ''}
-```
-"""
         }
 
+        # One join over small fragments lets CPython size the result
+        # buffer once instead of growing it hole by hole; with the 1000
+        # character content slice involved those regrows are full copies.
+        # Skipped entirely when the caller opted out of the text form
+        if include_suggested:
+            wrapped["suggested_response"] = "".join((
+                "\nFile: ", base_name,
+                "\nLocation: ", abs_path,
+                "\nType: ", file_type,
+                "\nSize: ", str(file_size), " bytes",
+                "\nLines: ", str(line_count),
+                "\n\nContent of ", base_name, ":\n```\n",
+                content[:1000], "..." if file_size > 1000 else "",
+                "\n```\n",
+            ))
+
+        return wrapped
+
 # Example usage:
 # wrapped_output = OutputWrapper.wrap_cli_output("ls -la /home/user", "drwxr-xr-x 2 user user 4096 Jan 1 12:00 file.txt")
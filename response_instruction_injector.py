@@ -8,8 +8,70 @@ explicit instructions and guidance to API responses.
 
 import os
 import json
+import functools
 from typing import Dict, Any, List, Optional, Union
 
+# The instruction blocks below are multi-KB strings that only vary with
+# the command or extracted path, and ChatGPT tends to repeat the same
+# few commands; bounded caches mean a repeat request splices a
+# ready-made string instead of re-rendering the template
+
+
+@functools.lru_cache(maxsize=256)
+def _default_instructions(command: str) -> str:
+    return f"""
+When reporting the results of this command, please:
+1. Show the exact command executed: `{command}`
+2. Present the output exactly as shown, without alteration
+3. Do not make assumptions about file or directory structures not present in the output
+                """
+
+
+@functools.lru_cache(maxsize=256)
+def _directory_listing_instructions(target_dir: str) -> str:
+    return f"""
+IMPORTANT - DIRECTORY LISTING WARNING:
+When reporting the results of this directory listing:
+
+1. Always explicitly state that these files are in EXACTLY this directory: `{target_dir}`
+2. If the output shows files, these exist ONLY in `{target_dir}` - NOT in parent directories
+3. DO NOT state or imply that these files exist anywhere else
+4. DO NOT expand or extrapolate beyond what is shown in the output
+5. If referring to these files later, always include the full directory path
+
+Example correct response format:
+"Here are the files in the EXACT directory `{target_dir}` (not in parent or other directories):
+- file1.txt
+- file2.txt"
+
+Example INCORRECT response (hallucination):
+"Here are the files in {os.path.dirname(target_dir)}:
+- file1.txt
+- file2.txt"
+            """
+
+
+@functools.lru_cache(maxsize=256)
+def _file_content_instructions(file_path: str) -> str:
+    return f"""
+IMPORTANT - FILE CONTENT WARNING:
+When reporting the content of this file:
+
+1. Always explicitly state the EXACT file path: `{file_path}`
+2. This content exists ONLY in the file `{file_path}`
+3. DO NOT claim this content exists in any other file
+4. Present file content without modifications or additions
+5. If referring to this file later, always use the complete file path
+
+Example correct response:
+"The content of file `{file_path}` is:
+(content here)"
+
+Example INCORRECT response (hallucination):
+"The content of file `{os.path.basename(file_path)}` in the parent directory is:
+(content here)"
+            """
+
 class ResponseInjector:
     """
     Injects anti-hallucination instructions into API responses
@@ -27,31 +89,27 @@ class ResponseInjector:
         Returns:
             Response dict with anti-hallucination guidance
         """
-        # Check if it's an 'ls' or 'dir' command
-        tokens = command.strip().split()
+        # Check if it's an 'ls' or 'dir' command; tokenize once here and
+        # thread the list into the helpers (split with no arguments
+        # already ignores surrounding whitespace)
+        tokens = command.split()
         base_cmd = tokens[0] if tokens else ""
-        
+
         if base_cmd in ["ls", "dir"]:
-            return ResponseInjector._inject_directory_listing_instructions(command, output)
+            return ResponseInjector._inject_directory_listing_instructions(command, tokens, output)
         elif base_cmd in ["cat", "more", "less", "type"]:
-            return ResponseInjector._inject_file_content_instructions(command, output)
+            return ResponseInjector._inject_file_content_instructions(command, tokens, output)
         else:
             # Default instruction injection
             return {
                 "output": output,
-                "instructions": f"""
-When reporting the results of this command, please:
-1. Show the exact command executed: `{command}`
-2. Present the output exactly as shown, without alteration
-3. Do not make assumptions about file or directory structures not present in the output
-                """
+                "instructions": _default_instructions(command)
             }
     
     @staticmethod
-    def _inject_directory_listing_instructions(command: str, output: str) -> Dict[str, Any]:
+    def _inject_directory_listing_instructions(command: str, tokens: List[str], output: str) -> Dict[str, Any]:
         """Add instructions specific to directory listings"""
-        # Find target directory in the command
-        tokens = command.strip().split()
+        # Find target directory in the pre-tokenized command
         target_dir = None
         
         # Look for a directory path in the command
@@ -74,34 +132,14 @@ When reporting the results of this command, please:
             "output": output,
             "command": command,
             "target_directory": target_dir,
-            "instructions": f"""
-IMPORTANT - DIRECTORY LISTING WARNING:
-When reporting the results of this directory listing:
-
-1. Always explicitly state that these files are in EXACTLY this directory: `{target_dir}`
-2. If the output shows files, these exist ONLY in `{target_dir}` - NOT in parent directories
-3. DO NOT state or imply that these files exist anywhere else
-4. DO NOT expand or extrapolate beyond what is shown in the output
-5. If referring to these files later, always include the full directory path
-
-Example correct response format:
-"Here are the files in the EXACT directory `{target_dir}` (not in parent or other directories):
-- file1.txt
-- file2.txt"
-
-Example INCORRECT response (hallucination):
-"Here are the files in {os.path.dirname(target_dir)}:
-- file1.txt
-- file2.txt"
-            """,
+            "instructions": _directory_listing_instructions(target_dir),
             "_warning": "Any response suggesting files exist elsewhere than the exact target directory is incorrect"
         }
     
     @staticmethod
-    def _inject_file_content_instructions(command: str, output: str) -> Dict[str, Any]:
+    def _inject_file_content_instructions(command: str, tokens: List[str], output: str) -> Dict[str, Any]:
         """Add instructions specific to file content display"""
-        # Extract filename from command
-        tokens = command.strip().split()
+        # Extract filename from the pre-tokenized command
         file_path = None
         
         # Look for a file path in the command (naively taking the last token)
@@ -112,23 +150,6 @@ Example INCORRECT response (hallucination):
             "output": output,
             "command": command,
             "file_path": file_path,
-            "instructions": f"""
-IMPORTANT - FILE CONTENT WARNING:
-When reporting the content of this file:
-
-1. Always explicitly state the EXACT file path: `{file_path}`
-2. This content exists ONLY in the file `{file_path}`
-3. DO NOT claim this content exists in any other file
-4. Present file content without modifications or additions
-5. If referring to this file later, always use the complete file path
-
-Example correct response:
-"The content of file `{file_path}` is:
-(content here)"
-
-Example INCORRECT response (hallucination):
-"The content of file `{os.path.basename(file_path)}` in the parent directory is:
-(content here)"
-            """,
+            "instructions": _file_content_instructions(file_path),
             "_warning": "Any response suggesting this content exists in a different file is incorrect"
         }
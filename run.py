@@ -15,17 +15,19 @@ Options:
 
 import os
 import sys
+import hashlib
 import subprocess
 import platform
-import json
 import socket
 import time
 import argparse
-import secrets
-import shutil
 from pathlib import Path
 import re
 
+# json, secrets, shutil and orjson are imported inside the functions
+# that need them; they only fire on specific code paths, so --help and
+# early failures skip their import cost entirely
+
 # ANSI colors for terminal output (works on most platforms)
 class Colors:
     GREEN = '\033[0;32m'
@@ -42,8 +44,14 @@ def print_header(title):
     print("=" * (len(title) + 5))
 
 
-def run_command(command, shell=True, check=False, capture_output=True):
-    """Run a shell command and return the result"""
+def run_command(command, shell=None, check=False, capture_output=True):
+    """Run a command and return the result.
+
+    Argv lists run without a shell (no extra /bin/sh fork or re-parse);
+    plain strings keep the old shell behavior for callers that need it.
+    """
+    if shell is None:
+        shell = isinstance(command, str)
     try:
         result = subprocess.run(
             command,
@@ -65,22 +73,23 @@ def run_command(command, shell=True, check=False, capture_output=True):
 
 def get_python_command():
     """Get the correct python command for the platform"""
-    # Try python3 first
-    try:
-        subprocess.run(["python3", "--version"], capture_output=True, text=True, check=True)
-        return "python3"
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        # Fall back to python
+    # This script is already running under a Python 3 interpreter, so
+    # its own executable is the right answer; no --version subprocesses
+    if sys.executable:
+        return sys.executable
+
+    # Frozen/embedded interpreters can leave sys.executable empty; only
+    # then fall back to probing the PATH
+    for candidate in ("python3", "python"):
         try:
-            version = subprocess.run(["python", "--version"], capture_output=True, text=True, check=True)
-            if "Python 3" in version.stdout:
-                return "python"
-            else:
-                print(f"{Colors.RED}Python 3 is required but not found{Colors.END}")
-                sys.exit(1)
+            version = subprocess.run([candidate, "--version"], capture_output=True, text=True, check=True)
+            if candidate == "python3" or "Python 3" in version.stdout:
+                return candidate
         except (subprocess.CalledProcessError, FileNotFoundError):
-            print(f"{Colors.RED}Python 3 is required but not found{Colors.END}")
-            sys.exit(1)
+            continue
+
+    print(f"{Colors.RED}Python 3 is required but not found{Colors.END}")
+    sys.exit(1)
 
 
 def setup_virtual_env(python_cmd):
@@ -94,7 +103,7 @@ def setup_virtual_env(python_cmd):
         print(f"{Colors.GREEN}✓ Virtual environment already exists{Colors.END}")
     else:
         print(f"Creating virtual environment using {python_cmd}...")
-        run_command(f"{python_cmd} -m venv {venv_dir}", check=True)
+        run_command([python_cmd, "-m", "venv", venv_dir], check=True)
         print(f"{Colors.GREEN}✓ Created virtual environment{Colors.END}")
 
     # Return paths to python and pip in the virtual environment
@@ -111,46 +120,57 @@ def setup_virtual_env(python_cmd):
 def install_dependencies(venv_pip):
     """Install required dependencies"""
     print_header("📦 Installing dependencies")
-    
-    # Upgrade pip first
-    print("Upgrading pip...")
-    result = run_command(f"{venv_pip} install --upgrade pip")
-    if result.returncode == 0:
-        print(f"{Colors.GREEN}✓ Pip upgraded successfully{Colors.END}")
-    
-    # Install requirements
+
     requirements_file = "requirements.txt"
-    if os.path.exists(requirements_file):
-        print(f"Installing packages from {requirements_file}...")
-        result = run_command(f"{venv_pip} install -r {requirements_file}")
-        if result.returncode == 0:
-            print(f"{Colors.GREEN}✓ Dependencies installed successfully{Colors.END}")
-        else:
-            print(f"{Colors.RED}Failed to install dependencies{Colors.END}")
-            sys.exit(1)
-    else:
+    try:
+        req_bytes = Path(requirements_file).read_bytes()
+    except FileNotFoundError:
         print(f"{Colors.RED}Error: {requirements_file} not found{Colors.END}")
         sys.exit(1)
 
+    # Skip pip entirely when requirements.txt is unchanged since the
+    # last successful install; the resolver costs seconds even when
+    # everything is already satisfied
+    req_hash = hashlib.sha256(req_bytes).hexdigest()
+    stamp = Path(os.path.dirname(os.path.dirname(venv_pip))) / ".req.sha256"
+    try:
+        if stamp.read_text() == req_hash:
+            print(f"{Colors.GREEN}✓ Dependencies already up to date{Colors.END}")
+            return
+    except OSError:
+        pass
+
+    print(f"Installing packages from {requirements_file}...")
+    result = run_command([venv_pip, "install", "-r", requirements_file])
+    if result.returncode == 0:
+        stamp.write_text(req_hash)
+        print(f"{Colors.GREEN}✓ Dependencies installed successfully{Colors.END}")
+    else:
+        print(f"{Colors.RED}Failed to install dependencies{Colors.END}")
+        sys.exit(1)
+
+
+# Matches KEY=value lines in one multiline pass; comment lines start
+# with '#' and can never match the identifier prefix
+_ENV_RE = re.compile(r'^([A-Za-z_][A-Za-z0-9_]*)=(.*)$', re.M)
+
 
 def read_env_file():
     """Read the .env file and return settings as a dictionary"""
-    env_file = ".env"
     settings = {
         "API_KEY": "",
         "SECURITY_LEVEL": "medium",
         "ALLOWED_PATHS": ""
     }
-    
-    if os.path.exists(env_file):
-        with open(env_file, "r") as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith("#"):
-                    if "=" in line:
-                        key, value = line.split("=", 1)
-                        settings[key] = value
-    
+
+    # One read and one regex pass instead of per-line strip/split work;
+    # opening directly also drops the exists() stat before the open
+    try:
+        text = Path(".env").read_text()
+    except FileNotFoundError:
+        return settings
+
+    settings.update(_ENV_RE.findall(text))
     return settings
 
 
@@ -161,24 +181,56 @@ def display_allowed_paths(paths):
         return
     
     paths_list = paths.split(",")
-    
+
     if len(paths_list) == 1:
         print(f"Currently allowed directory: {Colors.BOLD}{paths_list[0]}{Colors.END}")
     else:
-        print(f"Currently allowed directories:")
-        for i, path in enumerate(paths_list, 1):
-            print(f"  {i}. {Colors.BOLD}{path}{Colors.END}")
+        # One write for the whole listing instead of a print per line
+        lines = [f"  {i}. {Colors.BOLD}{path}{Colors.END}"
+                 for i, path in enumerate(paths_list, 1)]
+        sys.stdout.write("Currently allowed directories:\n" + "\n".join(lines) + "\n")
+
+
+def _resolve_paths(raw_paths):
+    """Normalize raw path strings to absolute paths, preserving order"""
+    return [os.path.abspath(os.path.expanduser(p)) for p in raw_paths]
+
+
+def _missing_paths(paths):
+    """Return the subset of paths that do not exist.
+
+    Checks are grouped by parent directory and each parent is scanned
+    once, so validating a large allow-list costs one scandir per
+    directory instead of one stat per path.
+    """
+    by_parent = {}
+    for path in paths:
+        by_parent.setdefault(os.path.dirname(path), []).append(path)
+
+    missing = []
+    for parent, group in by_parent.items():
+        try:
+            names = {entry.name for entry in os.scandir(parent)}
+        except OSError:
+            missing.extend(group)
+            continue
+        missing.extend(p for p in group if os.path.basename(p) not in names)
+    return missing
 
 
 def manage_allowed_paths(current_paths=""):
     """Interactive function to manage allowed directory paths"""
     print(f"\n{Colors.BLUE}Directory Access Configuration{Colors.END}")
     print("For security, ChatGPT middleware limits file access to specific directories.")
-    
+
     paths_list = []
     if current_paths:
-        paths_list = current_paths.split(",")
+        paths_list = _resolve_paths(current_paths.split(","))
         display_allowed_paths(current_paths)
+        # One batched pass over the configured list; stale entries get a
+        # single warning instead of silently staying around
+        for stale in _missing_paths(paths_list):
+            print(f"{Colors.YELLOW}Warning: configured directory {stale} does not exist.{Colors.END}")
     else:
         print(f"{Colors.YELLOW}No directories are currently configured for access.{Colors.END}")
     
@@ -209,13 +261,9 @@ def manage_allowed_paths(current_paths=""):
                 
                 if choice == '1':  # Add directory
                     new_path = input("Enter the directory path to add: ").strip()
-                    
-                    # Expand user home directory if needed
-                    if new_path.startswith("~"):
-                        new_path = os.path.expanduser(new_path)
-                    
-                    # Convert to absolute path
-                    new_path = os.path.abspath(new_path)
+
+                    # Normalize the same way the configured list is
+                    new_path = _resolve_paths([new_path])[0]
                     
                     # Check if path exists
                     if not os.path.exists(new_path):
@@ -236,9 +284,8 @@ def manage_allowed_paths(current_paths=""):
                         print(f"{Colors.RED}Cannot remove the last directory. At least one must be allowed.{Colors.END}")
                         continue
                     
-                    print("\nSelect a directory to remove:")
-                    for i, path in enumerate(paths_list, 1):
-                        print(f"{i}. {path}")
+                    sys.stdout.write("\nSelect a directory to remove:\n" + "\n".join(
+                        f"{i}. {path}" for i, path in enumerate(paths_list, 1)) + "\n")
                     
                     try:
                         index = int(input("\nEnter number to remove (or 0 to cancel): ").strip())
@@ -258,10 +305,10 @@ def manage_allowed_paths(current_paths=""):
                 else:
                     print(f"{Colors.RED}Invalid choice. Please enter 1, 2, or 3.{Colors.END}")
                 
-                # Display current list after each action
-                print("\nCurrent allowed directories:")
-                for i, path in enumerate(paths_list, 1):
-                    print(f"{i}. {Colors.BOLD}{path}{Colors.END}")
+                # Display current list after each action, in one write
+                lines = [f"{i}. {Colors.BOLD}{path}{Colors.END}"
+                         for i, path in enumerate(paths_list, 1)]
+                sys.stdout.write("\nCurrent allowed directories:\n" + "\n".join(lines) + "\n")
     
     # Return the final comma-separated list
     return ",".join(paths_list)
@@ -269,11 +316,9 @@ def manage_allowed_paths(current_paths=""):
 
 def write_env_file(settings):
     """Write settings to the .env file"""
-    env_file = ".env"
-    
-    with open(env_file, "w") as f:
-        for key, value in settings.items():
-            f.write(f"{key}={value}\n")
+    # Build the whole payload first so the file is written in one call
+    Path(".env").write_text(
+        "".join(f"{key}={value}\n" for key, value in settings.items()))
 
 
 def setup_env_file():
@@ -286,6 +331,7 @@ def setup_env_file():
     # Check if .env file exists
     if not os.path.exists(env_file):
         # Generate a new API key
+        import secrets
         settings["API_KEY"] = secrets.token_hex(16)
         settings["SECURITY_LEVEL"] = "medium"
         
@@ -310,7 +356,7 @@ def setup_env_file():
 def check_ngrok():
     """Check if ngrok is installed and available"""
     try:
-        result = run_command("ngrok --version", check=False)
+        result = run_command(["ngrok", "--version"], check=False)
         if result and result.returncode == 0:
             ngrok_version = result.stdout.strip()
             print(f"{Colors.GREEN}✓ Ngrok found: {ngrok_version}{Colors.END}")
@@ -326,24 +372,55 @@ def check_ngrok():
 
 
 def get_available_port(start_port=8000):
-    """Find an available port starting from start_port"""
-    port = start_port
-    max_port = start_port + 100  # Limit search to 100 ports
-    
-    while port < max_port:
-        try:
-            # Try to create a socket at the port
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(1)
-            sock.bind(('127.0.0.1', port))
-            sock.close()
-            return port
-        except OSError:
-            port += 1
-    
-    # If we get here, no ports were available
-    print(f"{Colors.YELLOW}⚠ No available ports found. Using default port {start_port}{Colors.END}")
-    return start_port
+    """Find an available port, preferring start_port"""
+    # Try the preferred port once, then let the kernel hand back a
+    # guaranteed-free ephemeral port with a single bind to port 0
+    # instead of probing a range one socket at a time
+    try:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind(('127.0.0.1', start_port))
+        sock.close()
+        return start_port
+    except OSError:
+        pass
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    print(f"{Colors.YELLOW}⚠ Port {start_port} is busy. Using port {port}{Colors.END}")
+    return port
+
+
+def _port_open(port):
+    """One cheap TCP connect to answer 'is something listening yet?'"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.settimeout(0.25)
+    try:
+        sock.connect(('127.0.0.1', port))
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+def wait_ready(port, timeout=15.0):
+    """Poll the port with backoff until it accepts or timeout elapses.
+
+    A bare connect() is an order of magnitude cheaper per attempt than
+    an HTTP round-trip; callers that want a status line still issue one
+    real request after this returns.
+    """
+    deadline = time.monotonic() + timeout
+    delay = 0.05
+    while time.monotonic() < deadline:
+        if _port_open(port):
+            return True
+        time.sleep(delay)
+        delay = min(delay * 1.5, 0.5)
+    return False
 
 
 def start_server(venv_python, port):
@@ -352,10 +429,11 @@ def start_server(venv_python, port):
     
     # Start the server as a background process
     if platform.system() == "Windows":
-        # Windows uses different syntax for background processes
+        # A new console via creationflags skips the cmd.exe wrapper the
+        # old 'start cmd /c' string spawned
         server_process = subprocess.Popen(
-            f"start cmd /c {venv_python} -m uvicorn main:app --host 0.0.0.0 --port {port}",
-            shell=True
+            [venv_python, "-m", "uvicorn", "main:app", "--host", "0.0.0.0", "--port", str(port)],
+            creationflags=subprocess.CREATE_NEW_CONSOLE
         )
     else:
         # Unix-like systems
@@ -365,21 +443,23 @@ def start_server(venv_python, port):
             stderr=subprocess.STDOUT
         )
     
-    # Give the server a moment to start
+    # Poll readiness instead of sleeping a fixed interval; a warm
+    # machine comes up in well under a second
     print(f"Starting server (PID: {server_process.pid})...")
-    time.sleep(3)
-    
-    # Check if server is running
+    wait_ready(port)
+
+    # Check if server is running; the stdlib client avoids dragging the
+    # whole requests/urllib3 stack into the launcher for one probe
     try:
-        import requests
-        response = requests.get(f"http://localhost:{port}/health", timeout=2)
-        if response.status_code == 200:
+        from urllib.request import urlopen
+        response = urlopen(f"http://localhost:{port}/health", timeout=2)
+        if response.status == 200:
             print(f"{Colors.GREEN}✓ Server is running{Colors.END}")
             print(f"  - Local URL: {Colors.BOLD}http://localhost:{port}{Colors.END}")
             print(f"  - Setup page: {Colors.BOLD}http://localhost:{port}/setup-gpt{Colors.END}")
             return server_process
         else:
-            print(f"{Colors.YELLOW}⚠ Server response code: {response.status_code}{Colors.END}")
+            print(f"{Colors.YELLOW}⚠ Server response code: {response.status}{Colors.END}")
             return server_process
     except Exception as e:
         print(f"{Colors.YELLOW}⚠ Server may not be running properly: {str(e)}{Colors.END}")
@@ -394,8 +474,8 @@ def start_ngrok(port):
     # Start ngrok as a background process
     if platform.system() == "Windows":
         ngrok_process = subprocess.Popen(
-            f"start cmd /c ngrok http {port}",
-            shell=True
+            ["ngrok", "http", str(port)],
+            creationflags=subprocess.CREATE_NEW_CONSOLE
         )
     else:
         ngrok_process = subprocess.Popen(
@@ -404,16 +484,17 @@ def start_ngrok(port):
             stderr=subprocess.DEVNULL
         )
     
-    # Give ngrok a moment to start
+    # Poll the agent API instead of sleeping a fixed five seconds
     print(f"Starting ngrok (PID: {ngrok_process.pid})...")
-    time.sleep(5)
-    
-    # Get the ngrok URL
+    wait_ready(4040)
+
+    # Get the ngrok URL via the stdlib client (see start_server)
     try:
-        import requests
-        response = requests.get("http://localhost:4040/api/tunnels", timeout=2)
-        data = response.json()
-        
+        import json
+        from urllib.request import urlopen
+        with urlopen("http://localhost:4040/api/tunnels", timeout=2) as response:
+            data = json.load(response)
+
         for tunnel in data.get('tunnels', []):
             if tunnel.get('proto') == 'https':
                 public_url = tunnel.get('public_url')
@@ -431,21 +512,30 @@ def start_ngrok(port):
 def update_schema(public_url, port):
     """Update the OpenAPI schema with the correct URL"""
     print_header("📝 Updating OpenAPI schema")
-    
+
+    # Imports this path alone needs; orjson is optional (run.py runs
+    # under the system interpreter where it may not be installed)
+    import json
+    import shutil
+    try:
+        import orjson
+    except ImportError:
+        orjson = None
+
     # Define schema file paths
     openapi_path = "openapi.json"
     schema_path = "schema.json"
-    
+
     try:
-        # Check if the OpenAPI schema file exists
-        if not os.path.exists(openapi_path):
+        # Read the existing OpenAPI schema; opening directly collapses
+        # the exists() stat and the open() into one syscall path
+        try:
+            with open(openapi_path, "r") as f:
+                schema = json.load(f)
+        except FileNotFoundError:
             print(f"{Colors.YELLOW}⚠ OpenAPI schema file not found. Will be generated by the server.{Colors.END}")
             return
         
-        # Read the existing OpenAPI schema
-        with open(openapi_path, "r") as f:
-            schema = json.load(f)
-        
         # Determine the URL to use - ensure proper RFC3986 formatting
         if public_url:
             # Sanitize the ngrok URL to ensure it's RFC3986 compliant
@@ -487,19 +577,35 @@ def update_schema(public_url, port):
         if "security" not in schema:
             schema["security"] = [{"ApiKeyAuth": []}]
         
-        # Create a backup of schema files before modifying
-        if os.path.exists(openapi_path):
-            shutil.copy2(openapi_path, f"{openapi_path}.bak")
-        if os.path.exists(schema_path):
+        # Create a backup of schema files before modifying; copy2 stats
+        # the source itself, so the exists() pre-checks were redundant
+        shutil.copy2(openapi_path, f"{openapi_path}.bak")
+        try:
             shutil.copy2(schema_path, f"{schema_path}.bak")
+        except FileNotFoundError:
+            pass
             
-        # Write the updated OpenAPI schema
-        with open(openapi_path, "w") as f:
-            json.dump(schema, f, indent=2)
-        
-        # Write the same content to schema.json to ensure they're in sync
-        with open(schema_path, "w") as f:
-            json.dump(schema, f, indent=2)
+        # Serialize once and write the same bytes to both files; the
+        # two json.dump calls each re-encoded the schema from scratch
+        if orjson is not None:
+            payload = orjson.dumps(schema, option=orjson.OPT_INDENT_2)
+        else:
+            payload = json.dumps(schema, indent=2).encode("utf-8")
+
+        # One atomic write, then hardlink schema.json to the same inode
+        # so the files cannot drift and the second write disappears;
+        # fall back to a plain copy where hardlinks are unavailable
+        tmp_path = f"{openapi_path}.tmp"
+        Path(tmp_path).write_bytes(payload)
+        os.replace(tmp_path, openapi_path)
+        try:
+            os.unlink(schema_path)
+        except FileNotFoundError:
+            pass
+        try:
+            os.link(openapi_path, schema_path)
+        except OSError:
+            shutil.copyfile(openapi_path, schema_path)
         
         print(f"{Colors.GREEN}✓ Schema files updated with URL: {server_url}{Colors.END}")
         print(f"  - Updated openapi.json and schema.json")
@@ -542,8 +648,11 @@ def main():
     parser.add_argument("--no-ngrok", action="store_true", help="Skip ngrok tunnel setup")
     args = parser.parse_args()
     
-    # Clear screen and print welcome message
-    os.system('cls' if platform.system() == "Windows" else 'clear')
+    # Clear screen and print welcome message; writing the ANSI sequence
+    # directly skips the shell fork+exec os.system('clear') costs, and
+    # modern Windows terminals understand the same escape
+    sys.stdout.write("\033[2J\033[H")
+    sys.stdout.flush()
     print(f"{Colors.BOLD}🚀 ChatGPT System Access - All-in-One Runner{Colors.END}")
     print("=" * 50)
     
@@ -9,7 +9,11 @@ anti-hallucination protections to prevent directory listing issues.
 import os
 import json
 import sys
-from subprocess import Popen, PIPE
+import time
+import shutil
+import selectors
+from pathlib import PurePath
+from subprocess import Popen, PIPE, TimeoutExpired
 from flask import Flask, request, jsonify
 from dotenv import load_dotenv
 from response_instruction_injector import ResponseInjector
@@ -22,14 +26,107 @@ app = Flask(__name__)
 # Get API key from environment
 API_KEY = os.getenv("API_KEY", "default_middleware_key")
 
-# Security settings
-ALLOWED_COMMANDS = ["ls", "dir", "cat", "head", "tail", "grep", "pwd", "echo"]
+# Security settings; a frozenset gives O(1) membership checks, same as
+# the main server's Config
+ALLOWED_COMMANDS = frozenset({"ls", "dir", "cat", "head", "tail", "grep", "pwd", "echo"})
 ALLOWED_PATHS = os.getenv("ALLOWED_PATHS", os.getcwd())
 if isinstance(ALLOWED_PATHS, str) and "," in ALLOWED_PATHS:
     ALLOWED_PATHS = [p.strip() for p in ALLOWED_PATHS.split(",")]
 else:
     ALLOWED_PATHS = [ALLOWED_PATHS]
 
+# Normalized once at import; str.startswith accepts a tuple, so the
+# per-argument check is one C-level call instead of a Python loop over
+# the allow-list
+ALLOWED_PREFIXES = tuple(os.path.abspath(p) for p in ALLOWED_PATHS)
+_ALLOWED_PURE = tuple(PurePath(p) for p in ALLOWED_PREFIXES)
+
+
+def _path_allowed(part):
+    """Whole-component containment check for a path-like argument.
+
+    The startswith(tuple) prefilter rejects most disallowed paths in one
+    C call; anything that passes is then compared component-wise so an
+    allowed /etc/passwd does not admit /etc/passwd_backup.
+    """
+    target = os.path.abspath(os.path.expanduser(part))
+    if not target.startswith(ALLOWED_PREFIXES):
+        return False
+    pure = PurePath(target)
+    return any(pure.is_relative_to(allowed) for allowed in _ALLOWED_PURE)
+
+# Resolve each allowed command on the PATH once so the child process
+# execs the absolute path directly instead of re-searching per request
+RESOLVED_COMMANDS = {c: shutil.which(c) or c for c in ALLOWED_COMMANDS}
+
+# Shell operators have never worked reliably here and now that commands
+# run without a shell they would be passed as literal arguments; reject
+# them up front instead
+_SHELL_TOKENS = frozenset({"|", "||", "&&", ";", "&", ">", ">>", "<"})
+
+# Hard caps for command execution: wall time and bytes kept per pipe
+CMD_TIMEOUT = 30
+MAX_OUTPUT_BYTES = 1 << 20
+
+
+def _read_bounded(process, timeout=CMD_TIMEOUT, limit=MAX_OUTPUT_BYTES):
+    """Drain stdout/stderr up to limit bytes each, killing on overflow.
+
+    communicate() buffers the child's entire output, so a runaway cat
+    of a multi-GB file would be held in memory before the response is
+    built; this keeps memory at O(limit) and enforces a deadline.
+
+    On Windows the default selector is select()-based and only accepts
+    sockets, not pipes, so that platform keeps communicate() with the
+    same deadline and a post-hoc cap.
+    """
+    if os.name == "nt":
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
+            truncated = False
+        except TimeoutExpired:
+            process.kill()
+            stdout, stderr = process.communicate()
+            truncated = True
+        if len(stdout) > limit or len(stderr) > limit:
+            stdout, stderr = stdout[:limit], stderr[:limit]
+            truncated = True
+        return (stdout.decode("utf-8", errors="replace"),
+                stderr.decode("utf-8", errors="replace"),
+                truncated)
+
+    sel = selectors.DefaultSelector()
+    buffers = {}
+    for pipe in (process.stdout, process.stderr):
+        sel.register(pipe, selectors.EVENT_READ)
+        buffers[pipe] = bytearray()
+
+    deadline = time.monotonic() + timeout
+    truncated = False
+    while sel.get_map():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            process.kill()
+            truncated = True
+            break
+        for key, _ in sel.select(remaining):
+            chunk = os.read(key.fd, 65536)
+            if not chunk:
+                sel.unregister(key.fileobj)
+                continue
+            buf = buffers[key.fileobj]
+            buf += chunk
+            if len(buf) > limit:
+                del buf[limit:]
+                process.kill()
+                truncated = True
+                sel.unregister(key.fileobj)
+    sel.close()
+    process.wait()
+    return (buffers[process.stdout].decode("utf-8", errors="replace"),
+            buffers[process.stderr].decode("utf-8", errors="replace"),
+            truncated)
+
 @app.route("/cli", methods=["GET", "POST"])
 def cli_endpoint():
     """Execute CLI command with anti-hallucination protection"""
@@ -51,36 +148,35 @@ def cli_endpoint():
     if not command:
         return jsonify({"error": "Missing 'command' parameter"}), 400
     
-    # Basic security check
-    cmd_parts = command.strip().split()
+    # Basic security check; command is tokenized exactly once here
+    cmd_parts = command.split()
     base_cmd = cmd_parts[0] if cmd_parts else ""
-    
+
     if base_cmd not in ALLOWED_COMMANDS:
         return jsonify({"error": f"Command '{base_cmd}' not allowed"}), 403
-    
+
+    if not _SHELL_TOKENS.isdisjoint(cmd_parts):
+        return jsonify({"error": "Shell operators are not supported"}), 400
+
     # Path security check for directory listing
-    has_path = False
     for part in cmd_parts[1:]:
-        if part.startswith("/") or part.startswith("~"):
-            has_path = True
-            path_allowed = False
-            for allowed in ALLOWED_PATHS:
-                if part.startswith(allowed):
-                    path_allowed = True
-                    break
-            if not path_allowed:
-                return jsonify({"error": f"Path '{part}' not allowed"}), 403
+        if part.startswith(("/", "~")) and not _path_allowed(part):
+            return jsonify({"error": f"Path '{part}' not allowed"}), 403
     
-    # Execute command
+    # Execute the tokenized command directly: one fork+exec instead of
+    # going through /bin/sh, and no shell parsing of user input
+    cmd_parts[0] = RESOLVED_COMMANDS.get(base_cmd, base_cmd)
     try:
-        process = Popen(command, shell=True, stdout=PIPE, stderr=PIPE, text=True)
-        stdout, stderr = process.communicate()
-        
-        if process.returncode != 0:
+        process = Popen(cmd_parts, stdout=PIPE, stderr=PIPE)
+        stdout, stderr, truncated = _read_bounded(process)
+
+        if process.returncode != 0 and not truncated:
             return jsonify({"error": f"Command failed: {stderr}"}), 500
-        
+
         # Create response with anti-hallucination instructions
         response = ResponseInjector.inject_cli_instructions(command, stdout)
+        if truncated:
+            response["truncated"] = True
         return jsonify(response)
         
     except Exception as e:
@@ -101,7 +197,20 @@ if __name__ == "__main__":
     
     # Start the server
     print(f"Starting simple CLI server on port {port}")
-    print(f"Allowed commands: {', '.join(ALLOWED_COMMANDS)}")
+    print(f"Allowed commands: {', '.join(sorted(ALLOWED_COMMANDS))}")
     print(f"Allowed paths: {ALLOWED_PATHS}")
-    
-    app.run(host="0.0.0.0", port=port, debug=True)
+
+    # Debug mode (reloader, tracebacks) is opt-in instead of always on
+    debug = os.getenv("FLASK_DEBUG", "").lower() in ("1", "true", "yes")
+
+    # Prefer the waitress production server when it is installed; the
+    # Flask dev server serializes requests and runs a reloader watcher
+    try:
+        from waitress import serve
+    except ImportError:
+        serve = None
+
+    if serve is not None and not debug:
+        serve(app, host="0.0.0.0", port=port, threads=8)
+    else:
+        app.run(host="0.0.0.0", port=port, debug=debug, threaded=True)
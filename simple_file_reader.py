@@ -7,15 +7,29 @@ anti-hallucination protections.
 """
 
 import os
-import json
 import sys
-from flask import Flask, request, jsonify
+import hmac
+import stat
+import asyncio
+import functools
+import threading
+from collections import OrderedDict
+from pathlib import PurePath
+import orjson
+from fastapi import FastAPI, Request, Response
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import FileResponse, JSONResponse
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-app = Flask(__name__)
+app = FastAPI(title="Simple File Reader")
+
+# File contents are highly compressible text, so gzip the multi-KB
+# envelopes for clients that accept it, as main.py does; small error
+# responses fall under the threshold and skip the compression cost
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 # Get API key from environment
 API_KEY = os.getenv("API_KEY", "default_middleware_key")
@@ -27,45 +41,41 @@ if isinstance(ALLOWED_PATHS, str) and "," in ALLOWED_PATHS:
 else:
     ALLOWED_PATHS = [ALLOWED_PATHS]
 
-@app.route("/read-file", methods=["GET"])
-def read_file_endpoint():
-    """Read file with anti-hallucination protection"""
-    # Check API key
-    api_key = request.headers.get("X-API-Key") or request.args.get("apiKey")
-    if api_key != API_KEY:
-        return jsonify({"error": "Invalid API key"}), 403
-    
-    # Get file path
-    path = request.args.get("path")
-    if not path:
-        return jsonify({"error": "Missing 'path' parameter"}), 400
-    
-    # Path security check
-    path_allowed = False
-    for allowed in ALLOWED_PATHS:
-        if path.startswith(allowed):
-            path_allowed = True
-            break
-    
-    if not path_allowed:
-        return jsonify({"error": f"Path '{path}' not allowed"}), 403
-    
-    # Check if file exists
-    if not os.path.isfile(path):
-        return jsonify({"error": f"File '{path}' not found"}), 404
-    
-    # Read file
-    try:
-        with open(path, 'r', encoding='utf-8') as file:
-            content = file.read()
-        
-        # Create response with anti-hallucination instructions
-        response = {
-            "content": content,
-            "file_path": path,
-            "file_name": os.path.basename(path),
-            "directory": os.path.dirname(path),
-            "instructions": f"""
+# Normalized once at import, as in simple_cli: startswith(tuple) is a
+# one-call C-level prefilter, and the PurePath comparison confirms on
+# whole components so /etc/passwd cannot admit /etc/passwd_backup
+ALLOWED_PREFIXES = tuple(os.path.realpath(p) for p in ALLOWED_PATHS)
+_ALLOWED_PURE = tuple(PurePath(p) for p in ALLOWED_PREFIXES)
+
+
+def _path_allowed(path):
+    """Whole-component containment check on the resolved path"""
+    real = os.path.realpath(path)
+    if not real.startswith(ALLOWED_PREFIXES):
+        return False
+    pure = PurePath(real)
+    return any(pure.is_relative_to(allowed) for allowed in _ALLOWED_PURE)
+
+
+# Files above this size skip the JSON envelope and stream instead
+STREAM_THRESHOLD = 64 * 1024
+
+# The two error bodies that carry no request-specific detail are
+# serialized once at import; auth failures tend to dominate traffic in
+# bot-scanned deployments, so the failure path skips the JSON encode
+_ERR_INVALID_KEY = orjson.dumps({"error": "Invalid API key"})
+_ERR_MISSING_PATH = orjson.dumps({"error": "Missing 'path' parameter"})
+
+
+@functools.lru_cache(maxsize=256)
+def _file_instructions(path):
+    """Render the anti-hallucination block once per path.
+
+    The text only varies with the path, and conversations hit the same
+    few files repeatedly, so repeat requests splice a ready-made string
+    (same pattern as ResponseInjector's cached templates).
+    """
+    return f"""
 IMPORTANT - FILE CONTENT WARNING:
 When reporting the content of this file:
 
@@ -82,30 +92,175 @@ Example correct response:
 Example INCORRECT response (hallucination):
 "The content of file `{os.path.basename(path)}` in a different directory is:
 (content here)"
-            """,
-            "_warning": "Any response suggesting this content exists in a different file is incorrect"
-        }
-        
-        return jsonify(response)
-        
+            """
+
+
+def _read_sync(path, size_hint=0):
+    """Blocking file read; only ever called from a worker thread.
+
+    Raw os.open/os.read sized from the stat the caller already holds,
+    then one decode of the whole buffer — skipping the buffered text
+    layer's incremental UTF-8 decoder and its intermediate copies (the
+    same pattern main.py uses for its schema read).
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        size = size_hint or os.fstat(fd).st_size
+        chunks = []
+        while True:
+            chunk = os.read(fd, max(size, 65536))
+            if not chunk:
+                break
+            chunks.append(chunk)
+    finally:
+        os.close(fd)
+    data = chunks[0] if len(chunks) == 1 else b"".join(chunks)
+    return data.decode("utf-8")
+
+
+# Custom-GPT conversations tend to re-read the same file many times,
+# and the whole JSON envelope is deterministic given the path and the
+# file's content, so the cache holds the fully serialized response
+# bytes — a hit skips the read, the UTF-8 decode, and the orjson
+# encode, leaving just a stat. Keyed by (path, mtime_ns, size) with
+# LRU eviction bounded by both entry count and total bytes
+_CACHE = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+_CACHE_MAX = 128
+_CACHE_BYTES_MAX = 64 * 1024 * 1024
+_cache_bytes = 0
+
+
+def _cached_envelope(path, st=None):
+    """Return the serialized JSON response body, cached while unchanged"""
+    global _cache_bytes
+    if st is None:
+        st = os.stat(path)
+    key = (path, st.st_mtime_ns, st.st_size)
+
+    with _CACHE_LOCK:
+        body = _CACHE.get(key)
+        if body is not None:
+            _CACHE.move_to_end(key)
+            return body
+
+    content = _read_sync(path, st.st_size)
+    body = orjson.dumps({
+        "content": content,
+        "file_path": path,
+        "file_name": os.path.basename(path),
+        "directory": os.path.dirname(path),
+        "instructions": _file_instructions(path),
+        "_warning": "Any response suggesting this content exists in a different file is incorrect"
+    })
+
+    with _CACHE_LOCK:
+        if key not in _CACHE:
+            _CACHE[key] = body
+            _cache_bytes += len(body)
+            while len(_CACHE) > _CACHE_MAX or _cache_bytes > _CACHE_BYTES_MAX:
+                _, evicted = _CACHE.popitem(last=False)
+                _cache_bytes -= len(evicted)
+    return body
+
+
+@app.get("/read-file")
+async def read_file_endpoint(request: Request):
+    """Read file with anti-hallucination protection"""
+    # Check API key in constant time
+    api_key = request.headers.get("X-API-Key") or request.query_params.get("apiKey")
+    if not hmac.compare_digest(api_key or "", API_KEY):
+        return Response(_ERR_INVALID_KEY, status_code=403,
+                        media_type="application/json")
+
+    # Get file path
+    path = request.query_params.get("path")
+    if not path:
+        return Response(_ERR_MISSING_PATH, status_code=400,
+                        media_type="application/json")
+
+    # Path security check; realpath resolves symlinks before the
+    # precomputed allow-list comparison
+    if not _path_allowed(path):
+        return JSONResponse({"error": f"Path '{path}' not allowed"}, status_code=403)
+
+    # One EAFP stat answers existence, type, and the streaming
+    # threshold; the old isfile + getsize pair cost two extra syscalls
+    # and could race with the read anyway
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return JSONResponse({"error": f"File '{path}' not found"}, status_code=404)
+    except PermissionError:
+        return JSONResponse({"error": f"Path '{path}' not allowed"}, status_code=403)
+    if not stat.S_ISREG(st.st_mode):
+        return JSONResponse({"error": f"'{path}' is not a regular file"}, status_code=400)
+
+    # Weak validator derived from the stat already in hand, the same
+    # shape main.py uses; pollers re-reading an unchanged file get an
+    # empty 304 before any read, decode, or encode happens
+    etag = f'W/"{st.st_size:x}-{st.st_mtime_ns:x}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    # raw=1, or any file too large for the JSON envelope, streams the
+    # bytes straight off disk — the server's sendfile path, no Python
+    # string copy and no JSON escaping. The provenance that normally
+    # rides in the JSON body moves into response headers
+    raw = request.query_params.get("raw") in ("1", "true", "yes")
+    if raw or st.st_size > STREAM_THRESHOLD:
+        return FileResponse(
+            path,
+            media_type="text/plain",
+            headers={
+                "ETag": etag,
+                "X-File-Path": path,
+                "X-File-Warning": "This content exists ONLY in the exact file path given in X-File-Path",
+            },
+        )
+
+    # Build (or fetch) the serialized response in a worker thread so
+    # the event loop keeps serving other requests while the disk I/O
+    # completes; repeat reads of an unchanged file return the cached
+    # bytes with no re-read, re-decode, or re-encode
+    try:
+        body = await asyncio.to_thread(_cached_envelope, path, st)
+        return Response(body, media_type="application/json",
+                        headers={"ETag": etag})
+
     except Exception as e:
-        return jsonify({"error": f"Error reading file: {str(e)}"}), 500
+        return JSONResponse({"error": f"Error reading file: {str(e)}"}, status_code=500)
 
 # Add other endpoints here as needed
 
 if __name__ == "__main__":
+    import uvicorn
+
     # Default port
     port = 8090
-    
+
     # Check if port specified in command line
     if len(sys.argv) > 1:
         try:
             port = int(sys.argv[1])
         except ValueError:
             print(f"Invalid port: {sys.argv[1]}, using default port 8090")
-    
+
     # Start the server
     print(f"Starting simple file reader server on port {port}")
     print(f"Allowed paths: {ALLOWED_PATHS}")
-    
-    app.run(host="0.0.0.0", port=port, debug=True)
+
+    # Same launch setup as main.py: ask for uvloop and httptools
+    # explicitly so a direct launch never silently falls back to the
+    # slower stdlib loop and h11 parser. The import string (rather than
+    # the app object) also lets uvicorn honour WEB_CONCURRENCY for
+    # multi-worker deployments; each worker keeps its own content cache
+    try:
+        import uvloop  # noqa: F401
+        loop = "uvloop"
+    except ImportError:
+        # uvloop does not support Windows; asyncio is the fallback there
+        loop = "asyncio"
+
+    uvicorn.run("simple_file_reader:app", host="0.0.0.0", port=port,
+                loop=loop, http="httptools")
@@ -0,0 +1,28 @@
+import os
+
+import pytest
+
+# Mock environment variables for testing (must be set before importing main,
+# since Config reads them at import time)
+os.environ["API_KEY"] = "test_api_key"
+os.environ["SECURITY_LEVEL"] = "low"
+
+
+@pytest.fixture(scope="session")
+def client(tmp_path_factory):
+    """One TestClient shared by the whole session.
+
+    Building the app and its engine is the expensive part of the suite,
+    so it happens once. The database lives in a per-session temporary
+    file (via the DATABASE_URL override) so every run starts from an
+    empty schema and never collides with a developer's localdb.sqlite3.
+    """
+    db_path = tmp_path_factory.mktemp("db") / "test.sqlite3"
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{db_path}"
+
+    from fastapi.testclient import TestClient
+
+    from main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
@@ -1,32 +1,7 @@
-import os
-import pytest
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
-
-# Import the FastAPI app and database models
-from main import app, Base, Item
-
-# Create a test database in memory
-TEST_DB_URL = "sqlite:///:memory:"
-engine = create_engine(
-    TEST_DB_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
-)
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-# Create the test database tables
-Base.metadata.create_all(bind=engine)
-
-# Mock environment variables for testing
-os.environ["API_KEY"] = "test_api_key"
-
-# Create a test client
-client = TestClient(app)
-
-def test_api_key_validation():
+# The shared session-scoped ``client`` fixture (and the environment and
+# database setup behind it) lives in conftest.py.
+
+def test_api_key_validation(client):
     """Test that API requests require a valid API key"""
     # Request without API key should fail
     response = client.get("/items/1")
@@ -40,11 +15,11 @@ def test_api_key_validation():
     response = client.get("/items/1", headers={"X-API-Key": "test_api_key"})
     assert response.status_code == 404  # Item doesn't exist yet
 
-def test_database_operations():
+def test_database_operations(client):
     """Test basic database CRUD operations"""
     # API key for all requests
     headers = {"X-API-Key": "test_api_key"}
-    
+
     # Create an item
     response = client.post(
         "/items",
@@ -56,7 +31,7 @@ def test_database_operations():
     assert data["name"] == "Test Item"
     assert data["description"] == "This is a test item"
     assert "id" in data
-    
+
     # Read the created item
     item_id = data["id"]
     response = client.get(f"/items/{item_id}", headers=headers)
@@ -65,16 +40,31 @@ def test_database_operations():
     assert data["name"] == "Test Item"
     assert data["description"] == "This is a test item"
 
-def test_file_operations(tmp_path):
+def test_batch_item_creation(client):
+    """Test bulk item creation through /items/batch"""
+    headers = {"X-API-Key": "test_api_key"}
+
+    response = client.post(
+        "/items/batch",
+        headers=headers,
+        json=[
+            {"name": "Batch Item 1", "description": "First batch item"},
+            {"name": "Batch Item 2", "description": "Second batch item"}
+        ]
+    )
+    assert response.status_code == 200
+    assert response.json()["count"] == 2
+
+def test_file_operations(client, tmp_path):
     """Test file read/write operations using a temporary directory"""
     # API key for all requests
     headers = {"X-API-Key": "test_api_key"}
-    
+
     # Create a temporary file
     test_file = tmp_path / "test.txt"
     test_content = "This is a test file."
     test_file.write_text(test_content)
-    
+
     # Test reading the file
     response = client.get(
         "/read-file",
@@ -84,7 +74,7 @@ def test_file_operations(tmp_path):
     assert response.status_code == 200
     data = response.json()
     assert data["content"] == test_content
-    
+
     # Test writing to a new file
     new_file = tmp_path / "new.txt"
     new_content = "This is a new test file."
@@ -96,5 +86,31 @@ def test_file_operations(tmp_path):
     assert response.status_code == 200
     assert new_file.read_text() == new_content
 
+def test_raw_file_operations(client, tmp_path):
+    """Test the streaming raw file read/write endpoints"""
+    # API key for all requests
+    headers = {"X-API-Key": "test_api_key"}
+
+    # Write a file from a raw byte stream
+    raw_file = tmp_path / "raw.bin"
+    raw_content = b"raw bytes content for streaming"
+    response = client.post(
+        "/write-file-raw",
+        headers={**headers, "Content-Type": "application/octet-stream"},
+        params={"path": str(raw_file)},
+        content=raw_content
+    )
+    assert response.status_code == 200
+    assert raw_file.read_bytes() == raw_content
+
+    # Read it back as raw bytes
+    response = client.get(
+        "/read-file-raw",
+        headers=headers,
+        params={"path": str(raw_file)}
+    )
+    assert response.status_code == 200
+    assert response.content == raw_content
+
 # Note: Testing the CLI endpoint would need special handling
 # since it runs actual system commands, which may not be desirable in tests.
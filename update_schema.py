@@ -12,6 +12,22 @@ import socket
 import requests
 from dotenv import load_dotenv
 
+# Parse .env once at import, as the other entry points do; main() used
+# to re-read it on every call
+load_dotenv()
+
+# Use the C-accelerated orjson serializer when available; fall back to
+# the stdlib so the script keeps working without it
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Shared session so the health and ngrok probes reuse one pooled
+# keep-alive connection, as gpt_config.py does
+SESSION = requests.Session()
+SESSION.mount("http://", requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=4))
+
 # ANSI colors for terminal output
 class Colors:
     BLUE = '\033[94m'
@@ -26,13 +42,12 @@ def main():
     print("================================================")
 
     # Load API key
-    load_dotenv()
     api_key = os.getenv("API_KEY", "default_middleware_key")
     
     # Check if server is running
     server_running = False
     try:
-        response = requests.get("http://localhost:8000/health", timeout=1)
+        response = SESSION.get("http://localhost:8000/health", timeout=1)
         if response.status_code == 200:
             server_running = True
             print(f"{Colors.GREEN}✓ Server is running{Colors.END}")
@@ -45,7 +60,7 @@ def main():
     # Detect publicly accessible URL (ngrok)
     public_url = None
     try:
-        response = requests.get("http://localhost:4040/api/tunnels", timeout=1)
+        response = SESSION.get("http://localhost:4040/api/tunnels", timeout=1)
         data = response.json()
         for tunnel in data.get('tunnels', []):
             if tunnel.get('proto') == 'https':
@@ -70,9 +85,10 @@ def main():
     schema_path = os.path.join(os.path.dirname(__file__), "openapi.json")
     
     try:
-        with open(schema_path, "r") as f:
-            schema = json.load(f)
-            
+        with open(schema_path, "rb") as f:
+            raw = f.read()
+        schema = orjson.loads(raw) if orjson is not None else json.loads(raw)
+
         current_url = schema.get("servers", [{}])[0].get("url", "")
         print(f"{Colors.BLUE}ℹ Current schema URL: {current_url}{Colors.END}")
         
@@ -85,10 +101,17 @@ def main():
         else:
             schema["servers"] = [{"url": server_url, "description": "Dynamic server endpoint"}]
             
-        # Write updated schema back
-        with open(schema_path, "w") as f:
-            json.dump(schema, f, indent=2)
-            
+        # Write updated schema back: encode once and swap the file in
+        # atomically so a reader never sees a truncated schema
+        if orjson is not None:
+            payload = orjson.dumps(schema, option=orjson.OPT_INDENT_2)
+        else:
+            payload = json.dumps(schema, indent=2).encode("utf-8")
+        tmp_path = f"{schema_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, schema_path)
+
         print(f"{Colors.GREEN}✓ Schema updated with URL: {server_url}{Colors.END}")
         
         # Print next steps
@@ -105,4 +128,7 @@ def main():
         print(f"{Colors.RED}✗ Error updating schema: {str(e)}{Colors.END}")
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    finally:
+        SESSION.close()